@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
     DB_USER: str
@@ -11,4 +12,46 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     HOST_IP_FOR_CLIENT: str
     IP_PC: str
+    TIMEZONE: str = "Asia/Jakarta"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT: int = 30000
+    DB_REPLICA_HOST: Optional[str] = None
+    DB_REPLICA_PORT: Optional[int] = None
+    DB_REPLICA_USER: Optional[str] = None
+    DB_REPLICA_PASSWORD: Optional[str] = None
+    DB_REPLICA_NAME: Optional[str] = None
+    DB_REPLICA_STICKY_SECONDS: int = 5
+    NOTIFICATION_RECONCILE_INTERVAL: int = 3600
+    NOTIFICATION_RETENTION_DAYS: int = 30
+    NOTIFICATION_MAX_PER_USER: int = 500
+    NOTIFICATION_PRUNE_BATCH_SIZE: int = 1000
+    NOTIFICATION_PRUNE_PAUSE: float = 0.5
+    NOTIFICATION_PRUNE_INTERVAL: int = 3600
+    HISTORY_PARTITION_MONTHS_AHEAD: int = 3
+    HISTORY_RETENTION_MONTHS: int = 24
+    HISTORY_ARCHIVE_DIR: str = "archive/history"
+    HISTORY_PARTITION_INTERVAL: int = 86400
+    DISCOVERY_CONCURRENCY: int = 256
+    DISCOVERY_MAX_HOSTS: int = 4096
+    EXPORT_CACHE_DIR: str = "cache/export"
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    IMPORT_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_PREVIEW_TTL: int = 900
+    IMPORT_PREVIEW_MAX_ENTRIES: int = 8
+    IMPORT_PREVIEW_MAX_ITEMS: int = 100
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 10
+    JOB_WORKERS: int = 2
+    JOB_MAX_PENDING: int = 10
+    JOB_RESULT_DIR: str = "cache/jobs"
+    JOB_RESULT_TTL: int = 86400
+    JOB_CLEANUP_INTERVAL: int = 3600
+    JOB_HEARTBEAT_INTERVAL: int = 30
+    JOB_STALE_AFTER: int = 120
 settings = Settings()
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCache:
+    """Cache file export di disk dengan eviction LRU dan batas ukuran.
+
+    Key dibentuk dari jenis export, parameter dan versi data tabel sumber,
+    sehingga entri lama tidak perlu di-invalidate: begitu data berubah key
+    ikut berubah dan entri lama tersingkir oleh LRU.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(export_type: str, params: dict, versions: dict) -> str:
+        payload = json.dumps(
+            {"type": export_type, "params": params, "versions": versions},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[tuple[str, dict]]:
+        path = self._data_path(key)
+        try:
+            with open(self._meta_path(key)) as f:
+                meta = json.load(f)
+            # mtime dipakai sebagai waktu akses terakhir untuk LRU
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return path, meta
+
+    def store_stream(self, key: str, chunks: Iterable[bytes], meta: dict):
+        """Teruskan chunks ke client sambil menulisnya ke cache.
+
+        Entri hanya disimpan jika seluruh file selesai dikirim; jika client
+        memutus koneksi atau build gagal, file sementara dibuang.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(dir=self.directory, suffix=".partial")
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            if completed:
+                with open(self._meta_path(key), "w") as f:
+                    json.dump(meta, f)
+                os.replace(partial_path, self._data_path(key))
+                self._evict()
+            else:
+                try:
+                    os.remove(partial_path)
+                except OSError:
+                    pass
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".bin"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name[:-4]))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for path in (self._data_path(key), self._meta_path(key)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                logger.info(f"Cache export {key[:12]} dihapus (LRU)")
+
+
+export_cache = ExportCache(settings.EXPORT_CACHE_DIR, settings.EXPORT_CACHE_MAX_BYTES)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_export_response(
+    request: Request,
+    export_type: str,
+    params: dict,
+    versions: dict,
+    filename: str,
+    build: Callable[[], dict]
+) -> Response:
+    """Response export dari cache, 304, atau hasil build yang sekaligus di-cache.
+
+    build() mengembalikan dict {"data", "filename", "media_type"} seperti
+    method export_* pada service. filename dibuat per request, sehingga
+    timestamp di nama file tidak ikut tersimpan di cache; isi file yang
+    di-cache tidak boleh memuat waktu ekspor.
+    """
+    key = export_cache.make_key(export_type, params, versions)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    cached = export_cache.get(key)
+    if cached:
+        path, meta = cached
+        return FileResponse(
+            path,
+            filename=filename,
+            media_type=meta["media_type"],
+            headers=headers
+        )
+
+    result = build()
+    meta = {"media_type": result["media_type"]}
+    headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return StreamingResponse(
+        content=export_cache.store_stream(key, result["data"], meta),
+        headers=headers,
+        media_type=result["media_type"]
+    )
@@ -1,15 +1,20 @@
 from typing import Any, Optional
 
-def success_response(message: str, data: Any = None):
+def success_response(message: str, data: Any = None, meta: Optional[dict] = None):
     """
     Response format untuk success
     """
-    return {
+    response = {
         "status": "success",
         "message": message,
         "data": data
     }
 
+    if meta is not None:
+        response["meta"] = meta
+
+    return response
+
 def error_response(message: str, error_data: Optional[Any] = None):
     """
     Response format untuk error
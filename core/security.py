@@ -3,8 +3,15 @@ from jose import JWTError, jwt
 from jose.exceptions import JWEError
 from passlib.context import CryptContext
 from dotenv import load_dotenv
+from concurrent.futures import Future, ProcessPoolExecutor
+from fastapi import HTTPException, status
+from typing import Iterable, Optional
+from core.config import settings
+import logging
+import multiprocessing
 import os
 import secrets
+import threading
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY or len(SECRET_KEY) < 32:
@@ -13,10 +20,91 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 6000
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
 
-def hash_password(password: str) -> str:
+def _bcrypt_hash(password: str) -> str:
+    # dijalankan di proses worker, harus fungsi level modul agar bisa di-pickle
     return pwd_context.hash(password)
 
+
+class PasswordHasher:
+    """Pool proses bersama untuk hashing bcrypt.
+
+    bcrypt memakai CPU penuh dan menahan GIL, sehingga hashing di thread
+    request memperlambat seluruh API. Hashing dijalankan di ProcessPoolExecutor
+    yang dibuat sekali saat lifespan start. Jumlah hash yang menunggu dibatasi
+    max_pending; jika slot tidak tersedia dalam queue_timeout detik, request
+    ditolak dengan 503. Sebelum start (seeder, script) hashing berjalan inline.
+    """
+
+    def __init__(self, max_workers: Optional[int], max_pending: int, queue_timeout: float):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        # spawn: proses worker tidak ikut mewarisi koneksi database dan thread aplikasi
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Password hasher start dengan {self.max_workers} proses")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self, password: str) -> Future:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server sedang sibuk memproses password, coba lagi nanti",
+                headers={"Retry-After": "5"}
+            )
+        try:
+            future = self._executor.submit(_bcrypt_hash, password)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash(self, password: str) -> str:
+        if self._executor is None:
+            return _bcrypt_hash(password)
+        return self._submit(password).result()
+
+    def hash_many(self, passwords: Iterable[str]) -> list[str]:
+        """Hash beberapa password sekaligus, hasil urut sesuai input.
+
+        Setiap password di-hash sendiri-sendiri agar salt tiap user berbeda,
+        walaupun password-nya sama.
+        """
+        if self._executor is None:
+            return [_bcrypt_hash(password) for password in passwords]
+
+        futures = []
+        try:
+            for password in passwords:
+                futures.append(self._submit(password))
+            return [future.result() for future in futures]
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
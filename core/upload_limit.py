@@ -0,0 +1,59 @@
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+from core.config import settings
+
+# ruang untuk boundary dan header multipart di luar isi file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def upload_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Ukuran file maksimal {max_bytes // (1024 * 1024)} MB"
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """Tolak upload multipart yang melebihi batas sebelum di-spool ke disk.
+
+    Content-Length dicek sebelum body dibaca; untuk upload tanpa
+    Content-Length (chunked) byte dihitung saat diterima dan request
+    dihentikan begitu batas terlewati.
+    """
+
+    def __init__(self, app, max_bytes: int = None):
+        self.app = app
+        self.max_bytes = max_bytes or settings.IMPORT_MAX_UPLOAD_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes + MULTIPART_OVERHEAD
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > limit:
+            error = upload_too_large(self.max_bytes)
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # diteruskan FastAPI saat parsing form, dijawab sebagai 413
+                    raise upload_too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,7 +1,17 @@
 from typing import Optional
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from fastapi import Request
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+import zlib
 
 from core.config import settings
 from dotenv import load_dotenv
@@ -12,37 +22,222 @@ from fastapi import HTTPException, status
 from typing import Optional
 load_dotenv()
 # DATABASE_URL = os.getenv("DATABASE_URL")
+logger = logging.getLogger(__name__)
+
+class PoolWaitStats:
+    """Akumulasi waktu tunggu checkout koneksi dari pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+def _timed_pool_class(base):
+    class TimedPool(base):
+        wait_stats = PoolWaitStats()
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                self.wait_stats.record(time.perf_counter() - started)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
 
 DATABASE_URL = (
     f"postgresql://{settings.DB_USER}:{settings.DB_PASSWORD}@"
     f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
 )
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, poolclass=_timed_pool_class(QueuePool), **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _init_connection(dbapi_connection, connection_record):
+    # dijalankan sekali per koneksi fisik, bukan per request
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SET TIME ZONE %s", (settings.TIMEZONE,))
+    cursor.execute("SET statement_timeout = %s", (settings.DB_STATEMENT_TIMEOUT,))
+    cursor.close()
+    dbapi_connection.commit()
+
+event.listen(engine, "connect", _init_connection)
+
+# replica opsional untuk endpoint list dan export yang hanya membaca
+replica_engine = None
+ReplicaSessionLocal = SessionLocal
+if settings.DB_REPLICA_HOST:
+    REPLICA_DATABASE_URL = (
+        f"postgresql://{settings.DB_REPLICA_USER or settings.DB_USER}:"
+        f"{settings.DB_REPLICA_PASSWORD or settings.DB_PASSWORD}@"
+        f"{settings.DB_REPLICA_HOST}:{settings.DB_REPLICA_PORT or settings.DB_PORT}/"
+        f"{settings.DB_REPLICA_NAME or settings.DB_NAME}"
+    )
+    replica_engine = create_engine(REPLICA_DATABASE_URL, poolclass=_timed_pool_class(QueuePool), **POOL_OPTIONS)
+    event.listen(replica_engine, "connect", _init_connection)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+# engine async (asyncpg) untuk path yang berjalan di event loop:
+# stream, monitor CCTV dan pembuatan notifikasi
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@"
+    f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=_timed_pool_class(AsyncAdaptedQueuePool),
+    connect_args={"server_settings": {
+        "timezone": settings.TIMEZONE,
+        "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT),
+    }},
+    **POOL_OPTIONS
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def pool_stats(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **type(pool).wait_stats.snapshot(),
+    }
+
+
+def get_pool_stats() -> dict:
+    stats = {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.sync_engine.pool),
+    }
+    if replica_engine is not None:
+        stats["replica"] = pool_stats(replica_engine.pool)
+    return stats
+
+
+# read-your-writes: client yang baru saja menulis tetap dibaca dari primary
+# selama DB_REPLICA_STICKY_SECONDS. Disimpan per proses worker.
+_recent_writers: dict[str, float] = {}
+_recent_writers_lock = threading.Lock()
+
+
+def _writer_key(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def mark_recent_write(authorization: Optional[str]):
+    key = _writer_key(authorization)
+    if key is None or replica_engine is None:
+        return
+    now = time.monotonic()
+    with _recent_writers_lock:
+        _recent_writers[key] = now + settings.DB_REPLICA_STICKY_SECONDS
+        if len(_recent_writers) > 10000:
+            for expired in [k for k, until in _recent_writers.items() if until < now]:
+                del _recent_writers[expired]
+
+
+def has_recent_write(authorization: Optional[str]) -> bool:
+    key = _writer_key(authorization)
+    if key is None:
+        return False
+    with _recent_writers_lock:
+        until = _recent_writers.get(key)
+    return until is not None and until > time.monotonic()
+
+
+def use_primary_for_read(authorization: Optional[str]) -> bool:
+    return replica_engine is None or has_recent_write(authorization)
+
 Base = declarative_base()
 
 def get_db():
     db = SessionLocal()
     try:
-        db.execute(text("SET TIMEZONE TO 'Asia/Jakarta'"))
-        db.commit()
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request):
+    use_primary = use_primary_for_read(request.headers.get("Authorization"))
+    db = SessionLocal() if use_primary else ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# hanya satu pg_dump dalam satu waktu, baik streaming maupun job
+_dump_lock = threading.Lock()
+DUMP_CHUNK_SIZE = 64 * 1024
+DUMP_FORMATS = {
+    # custom format sudah terkompresi oleh pg_dump
+    "custom": ("c", ".bak", "application/octet-stream"),
+    "plain": ("p", ".sql", "application/sql"),
+}
+DUMP_COMPRESSIONS = {
+    "gzip": (".gz", "application/gzip"),
+    "zstd": (".zst", "application/zstd"),
+}
+
+
+def _acquire_dump_lock():
+    if not _dump_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Dump database lain sedang berjalan, coba lagi nanti"
+        )
+
+
+def _compressor(compression: Optional[str]):
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Kompresi zstd membutuhkan paket zstandard di server"
+            )
+        return zstandard.ZstdCompressor().compressobj()
+    return None
+
+
 class DatabaseService:
-    def export_sql(self, table_name: Optional[str] = None, data_only: bool = False):
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        
-        if table_name:
-            filename = f"{table_name}_dump_{timestamp}.bak"
-            table_arg = ["-t", table_name]
-        else:
-            filename = f"full_db_dump_{timestamp}.bak"
-            table_arg = []
-        
-        file_path = os.path.join("/tmp", filename)
-        
+    def _dump_command(self, table_name: Optional[str], data_only: bool, dump_format: str) -> tuple[list, dict]:
         env_vars = os.environ.copy()
         
         if settings.DB_PASSWORD:
@@ -54,26 +249,137 @@ class DatabaseService:
             f"-U{settings.DB_USER}",
             f"-h{settings.DB_HOST}",
             f"-p{settings.DB_PORT}",
-            "-F", "c",
-            "-v",
+            "-F", DUMP_FORMATS[dump_format][0],
         ]
         
         if data_only:
             command.append("-a")
-            
-        command.extend(table_arg)
-        
+        if table_name:
+            command.extend(["-t", table_name])
+        return command, env_vars
+
+    def _dump_filename(self, table_name: Optional[str], dump_format: str) -> str:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        prefix = f"{table_name}_dump" if table_name else "full_db_dump"
+        return f"{prefix}_{timestamp}{DUMP_FORMATS[dump_format][1]}"
+
+    async def stream_sql(
+        self,
+        table_name: Optional[str] = None,
+        data_only: bool = False,
+        dump_format: str = "custom",
+        compression: Optional[str] = None
+    ) -> dict:
+        """Jalankan pg_dump dan alirkan stdout-nya langsung ke response.
+
+        Tidak ada file sementara; memori terpakai hanya sebesar satu chunk.
+        Kompresi gzip/zstd dilakukan sambil jalan dan hanya untuk format plain.
+        """
+        if compression and dump_format != "plain":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Kompresi hanya untuk format plain, format custom sudah terkompresi"
+            )
+        compressor = _compressor(compression)
+        command, env_vars = self._dump_command(table_name, data_only, dump_format)
+        _acquire_dump_lock()
+        process = None
+        stderr_task = None
+        closed = False
+
+        async def close():
+            # dipanggil dari body dan dari background task response; body
+            # bisa tidak pernah dijalankan jika client putus sebelum streaming
+            nonlocal closed
+            if closed:
+                return
+            closed = True
+            try:
+                if process is not None and process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                if stderr_task is not None and not stderr_task.done():
+                    stderr_task.cancel()
+            finally:
+                _dump_lock.release()
+
+        try:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=env_vars
+                )
+            except FileNotFoundError:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="pg_dump command not found. Is PostgreSQL installed and in PATH?"
+                )
+
+            stderr_task = asyncio.create_task(process.stderr.read())
+            # chunk pertama dibaca sebelum response dikirim agar error awal
+            # (koneksi, tabel tidak ada) masih bisa dikembalikan sebagai 500
+            first_chunk = await process.stdout.read(DUMP_CHUNK_SIZE)
+            if not first_chunk:
+                returncode = await process.wait()
+                if returncode != 0:
+                    stderr = (await stderr_task).decode(errors="replace")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Database export failed: {stderr.strip()}"
+                    )
+        except BaseException:
+            # termasuk request yang dibatalkan saat menunggu chunk pertama
+            await close()
+            raise
+
+        async def body():
+            try:
+                chunk = first_chunk
+                while chunk:
+                    data = compressor.compress(chunk) if compressor else chunk
+                    if data:
+                        yield data
+                    chunk = await process.stdout.read(DUMP_CHUNK_SIZE)
+
+                # cek exit code sebelum flush: trailer gzip/zstd membuat dump
+                # yang terpotong tampak lengkap, jadi response harus diputus
+                returncode = await process.wait()
+                if returncode != 0:
+                    stderr = (await stderr_task).decode(errors="replace")
+                    logger.error(f"pg_dump gagal di tengah streaming: {stderr.strip()}")
+                    raise RuntimeError(f"pg_dump exited with code {returncode}")
+                if compressor:
+                    yield compressor.flush()
+            finally:
+                # client memutus koneksi: hentikan pg_dump
+                await close()
+
+        filename = self._dump_filename(table_name, dump_format)
+        media_type = DUMP_FORMATS[dump_format][2]
+        if compression:
+            extension, media_type = DUMP_COMPRESSIONS[compression]
+            filename += extension
+        return {"data": body(), "close": close, "filename": filename, "media_type": media_type}
+
+    def export_sql(self, table_name: Optional[str] = None, data_only: bool = False):
+        """Dump ke file, dipakai job /jobs/db/dump."""
+        file_path = os.path.join(tempfile.gettempdir(), self._dump_filename(table_name, "custom"))
+        command, env_vars = self._dump_command(table_name, data_only, "custom")
         command.extend(["-f", file_path])
-        
+
+        _acquire_dump_lock()
         try:
             result = subprocess.run(
                 command, 
-                check=True, 
                 capture_output=True, 
                 text=True,
                 env=env_vars
             )
             if result.returncode != 0:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
                 raise Exception(f"pg_dump failed: {result.stderr}")
                                 
             return file_path
@@ -83,8 +389,12 @@ class DatabaseService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="pg_dump command not found. Is PostgreSQL installed and in PATH?"
             )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database export failed: {str(e)}"
-            )
\ No newline at end of file
+            )
+        finally:
+            _dump_lock.release()
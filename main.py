@@ -1,26 +1,52 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 import asyncio
 from core.config import settings
-from database import engine, Base, SessionLocal
+from core.security import password_hasher
+from core.upload_limit import UploadSizeLimitMiddleware
+from database import engine, async_engine, Base, SessionLocal, AsyncSessionLocal, mark_recent_write
 from routes import (
     auth_route, cctv_route, mediamtx_route, 
     notification_route, role_route, user_route, 
-    location_route, history_route, db_route
+    location_route, history_route, db_route,
+    search_route, job_route
 )
 # from models import *
 from services.monitoring_cctv import BackgroundCCTVMonitor
+from services.scheduler import BackgroundScheduler
+from services.notification_retention import NotificationRetentionService
+from services.history_partition_service import HistoryPartitionService
+from services.job_service import job_runner
+from repositories.notification_repository import NotificationRepository
+from repositories.history_repository import HistoryRepository
+from repositories.job_repository import JobRepository
+from migrations import prepare_database, run_migrations
 
 logging.basicConfig(level=logging.INFO, 
                     format='%(levelname)s:%(name)s:%(message)s')
 logger = logging.getLogger()
 
+prepare_database(engine)
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+with SessionLocal() as db:
+    HistoryPartitionService(HistoryRepository(db)).ensure_partitions()
 
 # background_task = None 
 
+
+def notification_retention(db) -> NotificationRetentionService:
+    return NotificationRetentionService(
+        NotificationRepository(db),
+        retention_days=settings.NOTIFICATION_RETENTION_DAYS,
+        max_per_user=settings.NOTIFICATION_MAX_PER_USER,
+        batch_size=settings.NOTIFICATION_PRUNE_BATCH_SIZE,
+        pause=settings.NOTIFICATION_PRUNE_PAUSE,
+    )
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan events"""
@@ -28,7 +54,7 @@ async def lifespan(app: FastAPI):
     
     monitor = BackgroundCCTVMonitor(
         check_interval=40,
-        db_session_factory=SessionLocal
+        db_session_factory=AsyncSessionLocal
     )
    
     monitor_task = asyncio.create_task(monitor.start())
@@ -36,11 +62,50 @@ async def lifespan(app: FastAPI):
     app.state.monitor = monitor
     
     logger.info("Background CCTV start")
+
+    password_hasher.start()
+    job_runner.start()
+
+    scheduler = BackgroundScheduler(db_session_factory=SessionLocal)
+    scheduler.add_job(
+        "reconcile_notification_count",
+        lambda db: NotificationRepository(db).reconcile_counts(),
+        interval=settings.NOTIFICATION_RECONCILE_INTERVAL,
+    )
+    scheduler.add_job(
+        "prune_notification",
+        lambda db: notification_retention(db).prune(),
+        interval=settings.NOTIFICATION_PRUNE_INTERVAL,
+        initial_delay=60,
+    )
+    scheduler.add_job(
+        "history_partition",
+        lambda db: HistoryPartitionService(HistoryRepository(db), notification_retention(db)).maintain(),
+        interval=settings.HISTORY_PARTITION_INTERVAL,
+        initial_delay=120,
+    )
+    scheduler.add_job(
+        "job_cleanup",
+        lambda db: job_runner.cleanup(JobRepository(db)),
+        interval=settings.JOB_CLEANUP_INTERVAL,
+        initial_delay=300,
+    )
+    scheduler.add_job(
+        "job_heartbeat",
+        lambda db: job_runner.heartbeat(JobRepository(db)),
+        interval=settings.JOB_HEARTBEAT_INTERVAL,
+        initial_delay=settings.JOB_HEARTBEAT_INTERVAL,
+    )
+    await scheduler.start()
+    app.state.scheduler = scheduler
     
     yield
     # Cleanup on shutdown
     logger.info("Shutting down...")
     await monitor.stop()
+    await scheduler.stop()
+    job_runner.shutdown()
+    password_hasher.shutdown()
     
     if monitor_task and not monitor_task.done():
         monitor_task.cancel()
@@ -48,6 +113,8 @@ async def lifespan(app: FastAPI):
             await monitor_task
         except asyncio.CancelledError:
             pass
+
+    await async_engine.dispose()
     
     logger.info("Shutdown complete")
     
@@ -62,6 +129,9 @@ origins = [
     f"{settings.IP_PC}"
 ]
 
+# ditambahkan sebelum CORS agar response 413 tetap membawa header CORS
+app.add_middleware(UploadSizeLimitMiddleware)
+
 #CORSMiddleware 
 app.add_middleware(
     CORSMiddleware,
@@ -71,6 +141,13 @@ app.add_middleware(
     allow_headers=["*"],  # Mengizinkan semua header HTTP
 )
 
+@app.middleware("http")
+async def track_recent_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        mark_recent_write(request.headers.get("Authorization"))
+    return response
+
 app.include_router(user_route.router)
 app.include_router(auth_route.router)
 app.include_router(role_route.router)
@@ -80,6 +157,8 @@ app.include_router(mediamtx_route.router)
 app.include_router(notification_route.router)
 app.include_router(history_route.router)
 app.include_router(db_route.router)
+app.include_router(search_route.router)
+app.include_router(job_route.router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,239 @@
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# create_all hanya membuat tabel yang belum ada. Perubahan pada tabel yang
+# sudah ada (kolom, index, data) dicatat di sini dan dijalankan sekali saja.
+MIGRATIONS = [
+    (
+        "0001_users_notification_count",
+        [
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS notification_count INTEGER NOT NULL DEFAULT 0",
+            """
+            UPDATE users u
+            SET notification_count = c.total
+            FROM (
+                SELECT id_user, count(*) AS total
+                FROM notification
+                GROUP BY id_user
+            ) c
+            WHERE u.id_user = c.id_user
+            """,
+        ],
+    ),
+    (
+        "0002_notification_user_index",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_notification_user_id ON notification (id_user, id_notification DESC)",
+        ],
+    ),
+    (
+        "0003_hot_path_indexes",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_history_cctv_created ON history (id_cctv, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS ix_history_created_at ON history (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_notification_history ON notification (id_history)",
+            "CREATE INDEX IF NOT EXISTS ix_cctv_location_active ON cctv_camera (id_location) WHERE deleted_at IS NULL",
+        ],
+    ),
+    (
+        "0004_partition_history",
+        [
+            # database baru sudah membuat history sebagai tabel partisi lewat create_all
+            """
+            DO $$
+            DECLARE
+                month_start timestamptz;
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_class WHERE relname = 'history' AND relkind = 'r') THEN
+                    RETURN;
+                END IF;
+
+                ALTER TABLE notification DROP CONSTRAINT IF EXISTS notification_id_history_fkey;
+                ALTER TABLE history RENAME TO history_legacy;
+                ALTER INDEX IF EXISTS history_pkey RENAME TO history_legacy_pkey;
+                ALTER INDEX IF EXISTS ix_history_cctv_created RENAME TO ix_history_legacy_cctv_created;
+                ALTER INDEX IF EXISTS ix_history_created_at RENAME TO ix_history_legacy_created_at;
+
+                CREATE TABLE history (
+                    id_history INTEGER NOT NULL DEFAULT nextval('history_id_history_seq'),
+                    id_cctv INTEGER REFERENCES cctv_camera (id_cctv),
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    status BOOLEAN,
+                    note VARCHAR(255),
+                    service BOOLEAN,
+                    PRIMARY KEY (id_history, created_at)
+                ) PARTITION BY RANGE (created_at);
+                ALTER SEQUENCE history_id_history_seq OWNED BY history.id_history;
+                CREATE INDEX ix_history_cctv_created ON history (id_cctv, created_at DESC);
+                CREATE INDEX ix_history_created_at ON history (created_at);
+
+                FOR month_start IN
+                    SELECT generate_series(
+                        date_trunc('month', coalesce((SELECT min(created_at) FROM history_legacy), now())),
+                        date_trunc('month', now()),
+                        interval '1 month'
+                    )
+                LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF history FOR VALUES FROM (%L) TO (%L)',
+                        'history_' || to_char(month_start, 'YYYY_MM'),
+                        month_start,
+                        month_start + interval '1 month'
+                    );
+                END LOOP;
+
+                INSERT INTO history (id_history, id_cctv, created_at, status, note, service)
+                SELECT id_history, id_cctv, coalesce(created_at, now()), status, note, service
+                FROM history_legacy;
+
+                DROP TABLE history_legacy;
+            END $$
+            """,
+        ],
+    ),
+    (
+        "0005_cctv_camera_type",
+        [
+            """
+            DO $$
+            BEGIN
+                CREATE TYPE camera_type AS ENUM ('ip', 'analog');
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$
+            """,
+            "ALTER TABLE cctv_camera ADD COLUMN IF NOT EXISTS camera_type camera_type NOT NULL DEFAULT 'ip'",
+            "UPDATE cctv_camera SET camera_type = 'analog' WHERE titik_letak ILIKE 'Analog%'",
+            "CREATE INDEX IF NOT EXISTS ix_cctv_stream_active ON cctv_camera (id_cctv) WHERE deleted_at IS NULL AND camera_type = 'ip'",
+            "CREATE INDEX IF NOT EXISTS ix_cctv_location_analog ON cctv_camera (id_location) WHERE camera_type = 'analog'",
+        ],
+    ),
+    (
+        "0006_cctv_ip_inet",
+        [
+            # uq_ipaddress_active ikut dibangun ulang oleh ALTER TYPE
+            "ALTER TABLE cctv_camera ALTER COLUMN ip_address TYPE INET USING nullif(trim(ip_address::text), '')::inet",
+            "CREATE INDEX IF NOT EXISTS ix_cctv_ip_gist ON cctv_camera USING gist (ip_address inet_ops) WHERE deleted_at IS NULL",
+        ],
+    ),
+    (
+        "0007_search_trigram_indexes",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_cctv_titik_trgm ON cctv_camera USING gin (titik_letak gin_trgm_ops) WHERE deleted_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_cctv_ip_trgm ON cctv_camera USING gin (host(ip_address) gin_trgm_ops) WHERE deleted_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_location_nama_trgm ON location USING gin (nama_lokasi gin_trgm_ops) WHERE deleted_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_users_nama_trgm ON users USING gin (nama gin_trgm_ops) WHERE deleted_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_users_username_trgm ON users USING gin (username gin_trgm_ops) WHERE deleted_at IS NULL",
+        ],
+    ),
+    (
+        "0008_data_version",
+        [
+            # versi data per tabel untuk key cache export
+            """
+            CREATE TABLE IF NOT EXISTS data_version (
+                name VARCHAR(63) PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0
+            )
+            """,
+            """
+            CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO data_version (name, version) VALUES (TG_TABLE_NAME, 1)
+                ON CONFLICT (name) DO UPDATE SET version = data_version.version + 1;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            # trigger per statement, bukan per baris, agar bulk insert cukup satu kali
+            """
+            CREATE TRIGGER trg_history_data_version
+            AFTER INSERT OR UPDATE OR DELETE ON history
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+            """,
+            # is_streaming diubah terus oleh monitor dan tidak ada di export
+            """
+            CREATE TRIGGER trg_cctv_camera_data_version
+            AFTER INSERT OR DELETE OR UPDATE OF titik_letak, ip_address, id_location, deleted_at ON cctv_camera
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+            """,
+            """
+            CREATE TRIGGER trg_location_data_version
+            AFTER INSERT OR UPDATE OR DELETE ON location
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+            """,
+            # last_login dan notification_count tidak ada di export
+            """
+            CREATE TRIGGER trg_users_data_version
+            AFTER INSERT OR DELETE OR UPDATE OF nama, username, nik, id_role, deleted_at ON users
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+            """,
+            """
+            CREATE TRIGGER trg_role_data_version
+            AFTER INSERT OR UPDATE OR DELETE ON role
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+            """,
+        ],
+    ),
+    (
+        "0009_job_owner",
+        [
+            "ALTER TABLE job ADD COLUMN IF NOT EXISTS owner VARCHAR(100)",
+            "ALTER TABLE job ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE",
+        ],
+    ),
+    (
+        "0010_notification_history_created_at",
+        [
+            "ALTER TABLE notification ADD COLUMN IF NOT EXISTS history_created_at TIMESTAMP WITH TIME ZONE",
+            """
+            UPDATE notification n
+            SET history_created_at = h.created_at
+            FROM history h
+            WHERE h.id_history = n.id_history AND n.history_created_at IS NULL
+            """,
+            # notifikasi tanpa history tidak pernah tampil; counter diperbaiki oleh reconcile
+            "DELETE FROM notification WHERE history_created_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_notification_history_created ON notification (history_created_at)",
+        ],
+    ),
+]
+
+MIGRATION_LOCK_KEY = 7402113
+
+# extension yang dibutuhkan oleh index di model, harus ada sebelum create_all
+EXTENSIONS = ["pg_trgm"]
+
+
+def prepare_database(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        for extension in EXTENSIONS:
+            conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+
+
+def run_migrations(engine: Engine):
+    with engine.begin() as conn:
+        # cegah beberapa worker uvicorn menjalankan migrasi bersamaan
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        # migrasi data bisa lebih lama dari DB_STATEMENT_TIMEOUT
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migration ("
+            "name VARCHAR(100) PRIMARY KEY, "
+            "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+        applied = set(conn.execute(text("SELECT name FROM schema_migration")).scalars())
+
+        for name, statements in MIGRATIONS:
+            if name in applied:
+                continue
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(
+                text("INSERT INTO schema_migration (name) VALUES (:name)"),
+                {"name": name}
+            )
+            logger.info(f"Migrasi {name} diterapkan")
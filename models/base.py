@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, BigInteger, Index
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, BigInteger, Index, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
\ No newline at end of file
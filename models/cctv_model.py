@@ -1,13 +1,45 @@
-from.base import Base, Column, Integer, String, ForeignKey, DateTime, Boolean, Index, relationship, func
+from.base import Base, Column, Integer, String, ForeignKey, DateTime, Boolean, Index, Enum, relationship, func
+import enum
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import INET
+from sqlalchemy.types import TypeDecorator
+
+class IpAddress(TypeDecorator):
+    """Kolom INET yang tetap dibaca sebagai string alamat host.
+
+    psycopg2 mengembalikan INET sebagai str, asyncpg sebagai objek
+    ipaddress; keduanya dinormalisasi ke "10.20.0.5".
+    """
+    impl = INET
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return str(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(getattr(value, "ip", value)).split("/")[0]
+
+class CameraType(str, enum.Enum):
+    ip = "ip"
+    # cctv analog mewakili DVR di satu lokasi, tidak di-stream lewat MediaMTX
+    analog = "analog"
 
 class CctvCamera(Base):
     __tablename__ = "cctv_camera"
 
     id_cctv = Column(Integer, primary_key=True)
     titik_letak = Column(String(50))
-    ip_address = Column(String(17))
+    ip_address = Column(IpAddress)
     stream_key = Column(String, unique=True)
     is_streaming = Column(Boolean, default=False)   
+    camera_type = Column(
+        Enum(CameraType, name="camera_type", values_callable=lambda e: [m.value for m in e]),
+        nullable=False,
+        default=CameraType.ip,
+        server_default=CameraType.ip.value,
+    )
     id_location = Column(Integer, ForeignKey("location.id_location", ondelete="CASCADE"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -26,6 +58,45 @@ class CctvCamera(Base):
                 unique=True, 
                 postgresql_where=Column('deleted_at') == None,
             ),
+            Index(
+                'ix_cctv_location_active',
+                'id_location',
+                postgresql_where=Column('deleted_at') == None,
+            ),
+            # query subnet (ip_address <<= '10.20.0.0/16')
+            Index(
+                'ix_cctv_ip_gist',
+                'ip_address',
+                postgresql_using='gist',
+                postgresql_ops={'ip_address': 'inet_ops'},
+                postgresql_where=Column('deleted_at') == None,
+            ),
+            # pencarian /search
+            Index(
+                'ix_cctv_titik_trgm',
+                'titik_letak',
+                postgresql_using='gin',
+                postgresql_ops={'titik_letak': 'gin_trgm_ops'},
+                postgresql_where=Column('deleted_at') == None,
+            ),
+            Index(
+                'ix_cctv_ip_trgm',
+                text('host(ip_address) gin_trgm_ops'),
+                postgresql_using='gin',
+                postgresql_where=Column('deleted_at') == None,
+            ),
+            # daftar stream untuk monitor: cctv ip yang aktif, urut id
+            Index(
+                'ix_cctv_stream_active',
+                'id_cctv',
+                postgresql_where=text("deleted_at IS NULL AND camera_type = 'ip'"),
+            ),
+            # cek lokasi DVR pada daftar lokasi
+            Index(
+                'ix_cctv_location_analog',
+                'id_location',
+                postgresql_where=text("camera_type = 'analog'"),
+            ),
         )
     
     # relasi ke lokasi
@@ -1,15 +1,37 @@
-from.base import Base, Integer, DateTime, String, Boolean, Column, ForeignKey, relationship, func
+from.base import Base, Integer, DateTime, String, Boolean, Column, ForeignKey, Index, relationship, func
 
 class History(Base):
     __tablename__ = "history"
 
-    id_history = Column(Integer, primary_key=True)
+    # tabel dipartisi per bulan pada created_at, sehingga kolom partisi
+    # ikut menjadi bagian dari primary key
+    id_history = Column(Integer, primary_key=True, autoincrement=True)
     id_cctv = Column(Integer, ForeignKey("cctv_camera.id_cctv"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
     status = Column(Boolean, default=False)
     note = Column(String(255), nullable=True)
     service = Column(Boolean, default=False)
+
+    __table_args__ = (
+            # history terakhir per cctv (monitor, setiap siklus)
+            Index(
+                'ix_history_cctv_created',
+                id_cctv,
+                created_at.desc(),
+            ),
+            # export berdasarkan rentang tanggal
+            Index(
+                'ix_history_created_at',
+                created_at,
+            ),
+            {"postgresql_partition_by": "RANGE (created_at)"},
+        )
     # relasi ke cctv
     cctv_camera = relationship("CctvCamera", back_populates="histories")
     # relasi ke notification
-    notifications = relationship("Notification", back_populates="history")
\ No newline at end of file
+    notifications = relationship(
+        "Notification",
+        back_populates="history",
+        primaryjoin="and_(History.id_history == foreign(Notification.id_history), "
+                    "History.created_at == foreign(Notification.history_created_at))"
+    )
\ No newline at end of file
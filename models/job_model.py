@@ -0,0 +1,44 @@
+from.base import Base, Column, Integer, String, ForeignKey, DateTime, Index, Enum, func
+import enum
+from sqlalchemy import JSON, Text
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id_job = Column(String(32), primary_key=True)
+    job_type = Column(String(30), nullable=False)
+    status = Column(
+        Enum(JobStatus, name="job_status", values_callable=lambda e: [m.value for m in e]),
+        nullable=False,
+        default=JobStatus.queued,
+        server_default=JobStatus.queued.value,
+    )
+    params = Column(JSON)
+    progress = Column(JSON)
+    # ringkasan hasil (import), file hasil (export/dump) disimpan di result_path
+    result = Column(JSON)
+    result_path = Column(String)
+    result_filename = Column(String)
+    media_type = Column(String)
+    error = Column(Text)
+    id_user = Column(Integer, ForeignKey("users.id_user", ondelete="SET NULL"))
+    # proses yang menjalankan job; heartbeat diperbarui selama job belum selesai
+    owner = Column(String(100))
+    heartbeat_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+            Index(
+                'ix_job_expires_at',
+                'expires_at',
+            ),
+        )
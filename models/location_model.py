@@ -13,6 +13,22 @@ class Location(Base):
                 unique=True, 
                 postgresql_where=Column('deleted_at') == None,
             ),
+            # pencarian /search
+            Index(
+                'ix_location_nama_trgm',
+                'nama_lokasi',
+                postgresql_using='gin',
+                postgresql_ops={'nama_lokasi': 'gin_trgm_ops'},
+                postgresql_where=Column('deleted_at') == None,
+            ),
         )
     # relasi ke cctv_camera
-    cctv_cameras = relationship("CctvCamera", back_populates="location", passive_deletes=True)
\ No newline at end of file
+    cctv_cameras = relationship("CctvCamera", back_populates="location", passive_deletes=True)
+    # DVR (cctv analog) milik lokasi ini, jika ada
+    dvr = relationship(
+        "CctvCamera",
+        primaryjoin="and_(Location.id_location == CctvCamera.id_location, "
+                    "CctvCamera.camera_type == 'analog', CctvCamera.deleted_at == None)",
+        uselist=False,
+        viewonly=True,
+    )
\ No newline at end of file
@@ -1,13 +1,37 @@
-from.base import Base, Column, relationship, ForeignKey, Integer
+from.base import Base, Column, relationship, ForeignKey, Integer, DateTime, Index
 
 class Notification(Base):
     __tablename__ = "notification"
 
     id_notification = Column(Integer, primary_key=True)
-    id_history = Column(Integer, ForeignKey("history.id_history"))
+    # tanpa foreign key: history dipartisi dan partisi lama diarsipkan
+    id_history = Column(Integer)
+    # created_at history (kunci partisi) agar join dan retensi bisa memangkas partisi
+    history_created_at = Column(DateTime(timezone=True))
     id_user = Column(Integer, ForeignKey("users.id_user"))
 
+    __table_args__ = (
+            Index(
+                'ix_notification_user_id',
+                id_user,
+                id_notification.desc(),
+            ),
+            Index(
+                'ix_notification_history',
+                id_history,
+            ),
+            Index(
+                'ix_notification_history_created',
+                history_created_at,
+            ),
+        )
+
     # relasi ke history
-    history = relationship("History", back_populates="notifications")
+    history = relationship(
+        "History",
+        back_populates="notifications",
+        primaryjoin="and_(foreign(Notification.id_history) == History.id_history, "
+                    "foreign(Notification.history_created_at) == History.created_at)"
+    )
     # relasi ke user
-    user = relationship("User", back_populates="notifications")
\ No newline at end of file
+    user = relationship("User", back_populates="notifications")
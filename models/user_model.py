@@ -10,6 +10,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_login = Column(DateTime(timezone=True))
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # jumlah notifikasi yang belum dibaca, dijaga oleh NotificationRepository
+    notification_count = Column(Integer, nullable=False, default=0, server_default="0")
     # Relationship
     # relasi ke role
     role = relationship("Role", back_populates="users")
@@ -30,6 +32,21 @@ class User(Base):
                 unique=True, 
                 postgresql_where=Column('deleted_at') == None,
             ),
+            # pencarian /search
+            Index(
+                'ix_users_nama_trgm',
+                'nama',
+                postgresql_using='gin',
+                postgresql_ops={'nama': 'gin_trgm_ops'},
+                postgresql_where=Column('deleted_at') == None,
+            ),
+            Index(
+                'ix_users_username_trgm',
+                'username',
+                postgresql_using='gin',
+                postgresql_ops={'username': 'gin_trgm_ops'},
+                postgresql_where=Column('deleted_at') == None,
+            ),
         )
     
     @property
@@ -1,8 +1,10 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 from models.role_model import Role
 from models.user_model import User
 from models.location_model import Location
-from models.cctv_model import CctvCamera
+from models.cctv_model import CctvCamera, CameraType
 from models.notification_model import Notification
-from models.history_model import History        
\ No newline at end of file
+from models.history_model import History
+from models.job_model import Job, JobStatus
\ No newline at end of file
@@ -1,5 +1,9 @@
-from.base import Session, CctvCamera, Location
-from sqlalchemy import Null, func, or_
+from.base import Session, AsyncSession, CctvCamera, CameraType, Location
+from.pagination import keyset_page, estimate_row_count
+from.search import trigram_match, trigram_score
+from sqlalchemy import Null, func, or_, select, text
+import csv
+import io
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -7,28 +11,49 @@ class CctvRepository:
     def __init__(self, db:Session):
         self.db = db
 
-    def get_all(self, skip: int = 0, limit: int = 500):
-        return(
+    def get_all(self, before_id: int = None, after_id: int = None, limit: int = 500, skip: int = 0, subnet: str = None):
+        query = (
             self.db.query(
                 CctvCamera.id_cctv,
                 CctvCamera.titik_letak,
                 CctvCamera.ip_address,
                 CctvCamera.is_streaming,
+                CctvCamera.camera_type,
                 CctvCamera.id_location,
                 CctvCamera.stream_key,
                 Location.nama_lokasi.label("cctv_location_name"),  
-                func.to_char(func.timezone('Asia/Jakarta', CctvCamera.created_at), 'YYYY-MM-DD HH24:MI:SS').label("created_at"),
-                func.to_char(func.timezone('Asia/Jakarta', CctvCamera.updated_at), 'YYYY-MM-DD HH24:MI:SS').label("updated_at"),
-                func.to_char(func.timezone('Asia/Jakarta', CctvCamera.deleted_at), 'YYYY-MM-DD HH24:MI:SS').label("deleted_at"),
+                CctvCamera.created_at,
+                CctvCamera.updated_at,
+                CctvCamera.deleted_at,
             )
             .join(Location, CctvCamera.id_location == Location.id_location)
             .where(CctvCamera.deleted_at == None)
-            .order_by(CctvCamera.id_cctv.desc())
-            .offset(skip)
+        )
+        if subnet:
+            query = query.filter(CctvCamera.ip_address.op("<<=")(subnet))
+        return keyset_page(query, CctvCamera.id_cctv, limit, before_id, after_id, skip=skip)
+
+    def estimate_total(self) -> int:
+        return estimate_row_count(self.db, CctvCamera.__tablename__)
+    
+    def search(self, q: str, limit: int = 20):
+        ip_text = func.host(CctvCamera.ip_address)
+        score = trigram_score([CctvCamera.titik_letak, ip_text], q).label("score")
+        return (
+            self.db.query(
+                CctvCamera.id_cctv,
+                CctvCamera.titik_letak,
+                ip_text.label("ip_address"),
+                Location.nama_lokasi.label("cctv_location_name"),
+                score,
+            )
+            .join(Location, CctvCamera.id_location == Location.id_location)
+            .filter(CctvCamera.deleted_at == None, trigram_match([CctvCamera.titik_letak, ip_text], q))
+            .order_by(score.desc(), CctvCamera.id_cctv.desc())
             .limit(limit)
             .all()
-    )
-    
+        )
+
     def get_all_stream(self, skip: int = 0, limit: int = 500):
         return(
             self.db.query(
@@ -38,7 +63,7 @@ class CctvRepository:
                 CctvCamera.is_streaming,
                 CctvCamera.stream_key,
             )
-            .where(CctvCamera.deleted_at == None, ~(CctvCamera.titik_letak.startswith("Analog")))
+            .where(CctvCamera.deleted_at == None, CctvCamera.camera_type == CameraType.ip)
             .order_by(CctvCamera.id_cctv.desc())
             .offset(skip)
             .limit(limit)
@@ -97,6 +122,12 @@ class CctvRepository:
     
     
     def get_all_for_export(self):
+        return self._export_query().all()
+
+    def iter_for_export(self, batch_size: int = 1000):
+        return self._export_query().yield_per(batch_size)
+
+    def _export_query(self):
         return (
             self.db.query(
                 CctvCamera.titik_letak,
@@ -105,17 +136,29 @@ class CctvRepository:
             )
             .join(Location, CctvCamera.id_location == Location.id_location)
             .where(CctvCamera.deleted_at == None)
-            .all()
+            .order_by(CctvCamera.id_cctv)
     )
 
-    def get_existing_cctvs(self, ip_list, postion_list):
+    def get_import_matches(self, ip_list: list[str], position_list: list[str]):
+        return (
+            self.db.query(
+                CctvCamera.id_cctv,
+                CctvCamera.titik_letak,
+                CctvCamera.ip_address,
+                CctvCamera.camera_type,
+                Location.nama_lokasi,
+            )
+            .outerjoin(Location, CctvCamera.id_location == Location.id_location)
+            .filter(or_(CctvCamera.ip_address.in_(ip_list), CctvCamera.titik_letak.in_(position_list)))
+            .where(CctvCamera.deleted_at == None)
+            .all()
+        )
+
+    def get_existing_in_subnets(self, subnets: list[str], position_list: list[str]):
+        in_subnets = or_(*(CctvCamera.ip_address.op("<<=")(subnet) for subnet in subnets))
         result = (
             self.db.query(CctvCamera)
-            .filter(
-                or_(
-                    CctvCamera.ip_address.in_(ip_list),
-                    CctvCamera.titik_letak.in_(postion_list))
-            )
+            .filter(or_(in_subnets, CctvCamera.titik_letak.in_(position_list)))
             .where(CctvCamera.deleted_at == None)
             .all()
         )
@@ -123,34 +166,158 @@ class CctvRepository:
             "ip": {c.ip_address: c for c in result},
             "position": {c.titik_letak: c for c in result}
         }
-    def bulk_create(self, cctv_data_list: list[dict]):
-        db_cctvs = [CctvCamera(**data) for data in cctv_data_list]
-        self.db.add_all(db_cctvs)
-        self.db.commit()
-        return db_cctvs
 
-    def bulk_update(self, updates: list[tuple[int, dict]]):
-        ids = [u[0] for u in updates]
+    def upsert_import(self, rows: list[dict]) -> dict:
+        """Simpan baris import dalam beberapa query berbasis set.
 
-        # query sekali
-        db_cctvs = (
-            self.db.query(CctvCamera)
-            .filter(CctvCamera.id_cctv.in_(ids))
-            .all()
-        )
+        Baris di-COPY ke tabel staging sementara, lokasi baru dibuat dan
+        id_location di-resolve di SQL, lalu cctv yang cocok (IP dulu, baru
+        titik letak) di-update dan sisanya di-insert. Tidak commit; tabel
+        staging ikut hilang saat transaksi selesai.
 
-        db_map = {c.id_cctv: c for c in db_cctvs}
+        Jika dua baris cocok ke cctv yang sama (satu lewat IP, satu lewat
+        titik letak), tidak ada yang ditulis ke cctv_camera dan pasangan
+        (baris, baris pertama) dikembalikan di "conflicts".
+        """
+        self.db.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS cctv_import_staging (
+                row_number integer,
+                titik_letak varchar(50) NOT NULL,
+                ip_address inet NOT NULL,
+                nama_lokasi varchar(50) NOT NULL,
+                camera_type camera_type NOT NULL,
+                id_location integer,
+                id_cctv integer
+            ) ON COMMIT DROP
+        """))
+        self.db.execute(text("TRUNCATE cctv_import_staging"))
 
-        for cctv_id, data in updates:
-            cctv = db_map.get(cctv_id)
-            if cctv:
-                for field, value in data.items():
-                    setattr(cctv, field, value)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row.get("_row"), row["titik_letak"], row["ip_address"], row["nama_lokasi"], row["camera_type"].value
+            ])
+        buffer.seek(0)
+        raw_connection = self.db.connection().connection
+        with raw_connection.cursor() as cursor:
+            cursor.copy_expert(
+                "COPY cctv_import_staging (row_number, titik_letak, ip_address, nama_lokasi, camera_type) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+
+        self.db.execute(text("""
+            INSERT INTO location (nama_lokasi)
+            SELECT DISTINCT nama_lokasi FROM cctv_import_staging
+            ON CONFLICT (nama_lokasi) WHERE deleted_at IS NULL DO NOTHING
+        """))
+        self.db.execute(text("""
+            UPDATE cctv_import_staging s SET id_location = l.id_location
+            FROM location l
+            WHERE l.nama_lokasi = s.nama_lokasi AND l.deleted_at IS NULL
+        """))
+        self.db.execute(text("""
+            UPDATE cctv_import_staging s SET id_cctv = c.id_cctv
+            FROM cctv_camera c
+            WHERE c.ip_address = s.ip_address AND c.deleted_at IS NULL
+        """))
+        self.db.execute(text("""
+            UPDATE cctv_import_staging s SET id_cctv = c.id_cctv
+            FROM cctv_camera c
+            WHERE s.id_cctv IS NULL AND c.titik_letak = s.titik_letak AND c.deleted_at IS NULL
+        """))
+
+        duplicates = self.db.execute(text("""
+            SELECT array_agg(row_number ORDER BY row_number) AS rows
+            FROM cctv_import_staging
+            WHERE id_cctv IS NOT NULL
+            GROUP BY id_cctv
+            HAVING count(*) > 1
+        """)).scalars().all()
+        if duplicates:
+            conflicts = sorted((row, rows[0]) for rows in duplicates for row in rows[1:])
+            return {"imported": 0, "updated": 0, "conflicts": conflicts}
+
+        updated = self.db.execute(text("""
+            UPDATE cctv_camera c SET
+                titik_letak = s.titik_letak,
+                ip_address = s.ip_address,
+                id_location = s.id_location,
+                camera_type = s.camera_type,
+                updated_at = now()
+            FROM cctv_import_staging s
+            WHERE c.id_cctv = s.id_cctv
+              AND (c.titik_letak, c.ip_address, c.id_location, c.camera_type)
+                  IS DISTINCT FROM (s.titik_letak, s.ip_address, s.id_location, s.camera_type)
+            RETURNING c.id_cctv
+        """)).all()
+
+        # ON CONFLICT menangani cctv dengan IP sama yang dibuat request lain
+        # setelah pencocokan di atas; xmax = 0 menandai baris yang benar-benar baru
+        inserted = self.db.execute(text("""
+            INSERT INTO cctv_camera (titik_letak, ip_address, id_location, camera_type, stream_key, is_streaming)
+            SELECT
+                titik_letak, ip_address, id_location, camera_type,
+                'loc_' || id_location || '_cam_' || left(md5(random()::text || clock_timestamp()::text), 8),
+                false
+            FROM cctv_import_staging
+            WHERE id_cctv IS NULL
+            ON CONFLICT (ip_address) WHERE deleted_at IS NULL DO UPDATE SET
+                titik_letak = EXCLUDED.titik_letak,
+                id_location = EXCLUDED.id_location,
+                camera_type = EXCLUDED.camera_type,
+                updated_at = now()
+            RETURNING id_cctv, (xmax = 0) AS created
+        """)).all()
+
+        created = sum(1 for row in inserted if row.created)
+        return {
+            "imported": created,
+            "updated": len(updated) + len(inserted) - created,
+        }
 
-        self.db.commit()
-        return list(db_map.values())
-        
     def get_by_ids(self, ids: list[int]):
         return self.db.query(CctvCamera).filter(CctvCamera.id_cctv.in_(ids)).all()
 
-        
\ No newline at end of file
+
+class AsyncCctvRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_stream(self, skip: int = 0, limit: int = 500):
+        result = await self.db.execute(
+            select(
+                CctvCamera.id_cctv,
+                CctvCamera.titik_letak,
+                CctvCamera.ip_address,
+                CctvCamera.is_streaming,
+                CctvCamera.stream_key,
+            )
+            .where(CctvCamera.deleted_at == None, CctvCamera.camera_type == CameraType.ip)
+            .order_by(CctvCamera.id_cctv.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def get_by_id(self, id_cctv: int):
+        result = await self.db.execute(select(CctvCamera).where(CctvCamera.id_cctv == id_cctv))
+        return result.scalars().first()
+
+    async def get_by_location(self, id_location: int):
+        result = await self.db.execute(
+            select(CctvCamera).where(CctvCamera.id_location == id_location, CctvCamera.deleted_at == None)
+        )
+        return result.scalars().all()
+
+    async def get_by_ids(self, ids: list[int]):
+        result = await self.db.execute(select(CctvCamera).where(CctvCamera.id_cctv.in_(ids)))
+        return result.scalars().all()
+
+    async def update_streaming_status(self, cctv_id: int, is_streaming: bool):
+        cctv = await self.get_by_id(cctv_id)
+        if cctv:
+            cctv.is_streaming = is_streaming
+            await self.db.commit()
+        return cctv
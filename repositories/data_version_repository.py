@@ -0,0 +1,21 @@
+from.base import Session
+from sqlalchemy import text
+
+
+class DataVersionRepository:
+    """Penghitung perubahan per tabel, dinaikkan oleh trigger statement.
+
+    Lihat migrasi 0008_data_version. Nilai hanya berguna untuk dibandingkan
+    (berubah atau tidak), bukan jumlah baris yang berubah.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_versions(self, names: list[str]) -> dict:
+        rows = self.db.execute(
+            text("SELECT name, version FROM data_version WHERE name = ANY(:names)"),
+            {"names": names}
+        ).all()
+        versions = {row.name: row.version for row in rows}
+        return {name: versions.get(name, 0) for name in names}
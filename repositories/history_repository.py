@@ -1,31 +1,32 @@
 from models.location_model import Location
-from.base import Session, History, CctvCamera
+from.base import Session, AsyncSession, History, CctvCamera
 from datetime import datetime, date
-from sqlalchemy import func
+from sqlalchemy import select, text
+from.pagination import keyset_page, estimate_row_count
 class HistoryRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all(self, skip: int = 0, limit: int = 500):
-        return (
+    def get_all(self, before_id: int = None, after_id: int = None, limit: int = 500, skip: int = 0):
+        query = (
             self.db.query(
                 History.id_history,
                 History.id_cctv,
                 History.note,
                 History.status,
                 History.service,
-                func.to_char(func.timezone('Asia/Jakarta', History.created_at), 'YYYY-MM-DD HH24:MI:SS').label("created_at"),
+                History.created_at,
                 CctvCamera.titik_letak.label("cctv_name"),
                 CctvCamera.ip_address.label("cctv_ip"),
                 Location.nama_lokasi.label("location_name")
             )
             .join(CctvCamera, History.id_cctv == CctvCamera.id_cctv)
             .join(Location, CctvCamera.id_location == Location.id_location)
-            .order_by(History.id_history.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
         )
+        return keyset_page(query, History.id_history, limit, before_id, after_id, skip=skip)
+
+    def estimate_total(self) -> int:
+        return estimate_row_count(self.db, History.__tablename__)
 
     def create_history(self, cctv_id: int,  service: bool = False) -> History:
             db_history = History(
@@ -90,6 +91,13 @@ class HistoryRepository:
         return db_history
 
     def get_all_fox_export(self, start_date: date, end_date: date):
+        return self._fox_export_query(start_date, end_date).all()
+
+    def iter_fox_export(self, start_date: date, end_date: date, batch_size: int = 1000):
+        # server-side cursor: baris diambil per batch, tidak dimuat sekaligus
+        return self._fox_export_query(start_date, end_date).yield_per(batch_size)
+
+    def _fox_export_query(self, start_date: date, end_date: date):
         end_datetime = datetime.combine(end_date, datetime.max.time())
         return (
             self.db.query(
@@ -105,5 +113,74 @@ class HistoryRepository:
             .join(Location, CctvCamera.id_location == Location.id_location)
             .filter(History.created_at.between(start_date, end_datetime))
             .order_by(History.created_at.desc())
-            .all()
-        )
\ No newline at end of file
+        )
+
+
+    def list_partitions(self) -> list[str]:
+        rows = self.db.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'history'::regclass
+            ORDER BY c.relname
+        """)).all()
+        return [row.relname for row in rows]
+
+    def create_partition(self, name: str, start: datetime, end: datetime):
+        # name dibentuk oleh HistoryPartitionService (history_YYYY_MM)
+        self.db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF history '
+            f'FOR VALUES FROM (:start) TO (:end)'
+        ), {"start": start, "end": end})
+        self.db.commit()
+
+    def copy_partition(self, name: str, fileobj):
+        raw_connection = self.db.connection().connection
+        with raw_connection.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH CSV HEADER', fileobj)
+        self.db.commit()
+
+    def drop_partition(self, name: str):
+        # notifikasi partisi ini sudah dihapus per batch oleh HistoryPartitionService
+        self.db.execute(text(f'ALTER TABLE history DETACH PARTITION "{name}"'))
+        self.db.execute(text(f'DROP TABLE "{name}"'))
+        # DETACH/DROP tidak memicu trigger data_version
+        self.db.execute(text("UPDATE data_version SET version = version + 1 WHERE name = 'history'"))
+        self.db.commit()
+
+class AsyncHistoryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, history_id: int):
+        result = await self.db.execute(select(History).where(History.id_history == history_id))
+        return result.scalars().first()
+
+    async def get_latest_by_cctv(self, cctv_id: int):
+        result = await self.db.execute(
+            select(History)
+            .where(History.id_cctv == cctv_id)
+            .order_by(History.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def create_history(self, cctv_id: int, service: bool = False) -> History:
+        db_history = History(
+            id_cctv=cctv_id,
+            service=service,
+            status=False
+        )
+        self.db.add(db_history)
+        await self.db.commit()
+        await self.db.refresh(db_history)
+        return db_history
+
+    async def update_service_status(self, history_id: int, service: bool) -> History:
+        db_history = await self.get_by_id(history_id)
+        if not db_history:
+            return None
+        db_history.service = service
+        await self.db.commit()
+        return db_history
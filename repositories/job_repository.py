@@ -0,0 +1,86 @@
+from.base import Session, Job, JobStatus
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from sqlalchemy import or_
+
+UNFINISHED = [JobStatus.queued, JobStatus.running]
+
+
+class JobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, id_job: str, job_type: str, params: dict, id_user: int, expires_at: datetime, owner: str):
+        db_job = Job(
+            id_job=id_job,
+            job_type=job_type,
+            params=params,
+            id_user=id_user,
+            expires_at=expires_at,
+            owner=owner,
+            heartbeat_at=datetime.now(ZoneInfo("UTC")),
+        )
+        self.db.add(db_job)
+        self.db.commit()
+        self.db.refresh(db_job)
+        return db_job
+
+    def get_by_id(self, id_job: str):
+        return self.db.query(Job).filter(Job.id_job == id_job).first()
+
+    def update(self, id_job: str, owner: str, **fields) -> bool:
+        # job yang sudah selesai atau ditandai gagal oleh proses lain tidak ditimpa
+        count = (
+            self.db.query(Job)
+            .filter(Job.id_job == id_job, Job.owner == owner, Job.status.in_(UNFINISHED))
+            .update(fields, synchronize_session=False)
+        )
+        self.db.commit()
+        return count > 0
+
+    def touch(self, owner: str) -> int:
+        count = (
+            self.db.query(Job)
+            .filter(Job.owner == owner, Job.status.in_(UNFINISHED))
+            .update({"heartbeat_at": datetime.now(ZoneInfo("UTC"))}, synchronize_session=False)
+        )
+        self.db.commit()
+        return count
+
+    def fail_owned(self, owner: str, statuses: list[JobStatus], error: str) -> int:
+        return self._fail(error, Job.owner == owner, Job.status.in_(statuses))
+
+    def fail_stale(self, owner: str, stale_before: datetime, error: str) -> int:
+        """Gagalkan job milik proses lain yang heartbeat-nya sudah berhenti."""
+        return self._fail(
+            error,
+            Job.status.in_(UNFINISHED),
+            or_(Job.owner.is_(None), Job.owner != owner),
+            or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < stale_before),
+        )
+
+    def _fail(self, error: str, *criteria) -> int:
+        count = (
+            self.db.query(Job)
+            .filter(*criteria)
+            .update({
+                "status": JobStatus.failed,
+                "error": error,
+                "finished_at": datetime.now(ZoneInfo("UTC")),
+            }, synchronize_session=False)
+        )
+        self.db.commit()
+        return count
+
+    def get_expired(self, now: datetime):
+        return (
+            self.db.query(Job)
+            .filter(Job.expires_at < now)
+            .filter(Job.status.in_([JobStatus.succeeded, JobStatus.failed]))
+            .all()
+        )
+
+    def delete_by_ids(self, ids: list[str]) -> int:
+        count = self.db.query(Job).filter(Job.id_job.in_(ids)).delete(synchronize_session=False)
+        self.db.commit()
+        return count
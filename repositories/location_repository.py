@@ -1,4 +1,7 @@
-from.base import Session, Location, CctvCamera
+from.base import Session, AsyncSession, Location, CctvCamera, CameraType
+from.pagination import keyset_page, estimate_row_count
+from.search import trigram_match, trigram_score
+from sqlalchemy import select
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -6,25 +9,36 @@ class LocationRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all(self, skip: int = 0, limit: int = 10):
+    def get_all(self, before_id: int = None, after_id: int = None, limit: int = 10, skip: int = 0):
         sub = (
             self.db.query(CctvCamera.id_location)
             .filter(
                 CctvCamera.id_location == Location.id_location,
-                CctvCamera.titik_letak.ilike("Analog%")   # CCTV Analog
+                CctvCamera.camera_type == CameraType.analog
             )
         )
 
-        return (
+        query = (
             self.db.query(Location)
             .filter(Location.deleted_at == None)
             .filter(~sub.exists())
-            .offset(skip)
+        )
+        return keyset_page(query, Location.id_location, limit, before_id, after_id, descending=False, skip=skip)
+
+    def estimate_total(self) -> int:
+        return estimate_row_count(self.db, Location.__tablename__)
+
+
+    def search(self, q: str, limit: int = 20):
+        score = trigram_score([Location.nama_lokasi], q).label("score")
+        return (
+            self.db.query(Location.id_location, Location.nama_lokasi, score)
+            .filter(Location.deleted_at == None, trigram_match([Location.nama_lokasi], q))
+            .order_by(score.desc(), Location.id_location)
             .limit(limit)
             .all()
         )
 
-
     def get_by_id(self, id_location: int):
         return self.db.query(Location).filter(Location.id_location == id_location).first()
 
@@ -75,19 +89,12 @@ class LocationRepository:
         self.db.delete(db_location)
         self.db.commit()
         return db_location
-    
-    def get_existing_locations(self, names: list[str]) -> dict:
-        result = (
-            self.db.query(Location)
-            .filter(Location.nama_lokasi.in_(names))
-            .where(Location.deleted_at == None)
-            .all()
-        )
-        return {loc.nama_lokasi: loc for loc in result}
 
-    
-    def bulk_create(self, location_names: list[str]):
-        db_locations = [Location(nama_lokasi=name) for name in location_names]
-        self.db.add_all(db_locations)
-        self.db.commit()
-        return db_locations
\ No newline at end of file
+
+class AsyncLocationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, id_location: int):
+        result = await self.db.execute(select(Location).where(Location.id_location == id_location))
+        return result.scalars().first()
@@ -1,24 +1,74 @@
-from.base import Session, Notification
-from typing import List
+from.base import Session, AsyncSession, Notification, User, History, CctvCamera, Location
+from sqlalchemy import insert, update, delete, select, literal, func, case, and_, DateTime
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+def _fan_out_statement(history_id: int, history_created_at: datetime):
+    active_users = (
+        select(literal(history_id), literal(history_created_at, DateTime(timezone=True)), User.id_user)
+        .where(User.deleted_at == None)
+    )
+    inserted = (
+        insert(Notification)
+        .from_select(["id_history", "history_created_at", "id_user"], active_users)
+        .returning(Notification.id_user)
+        .cte("inserted")
+    )
+    # insert notifikasi dan naikkan counter user dalam satu statement
+    return (
+        update(User)
+        .where(User.id_user.in_(select(inserted.c.id_user)))
+        .values(notification_count=User.notification_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+
 
 class NotificationRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, user_id:int, history_id:int) -> Notification:
-        notification = Notification(
-            id_history = history_id,
-            id_user = user_id
-        )
-        self.db.add(notification)
+    def create_for_active_users(self, history_id: int, history_created_at: datetime) -> int:
+        result = self.db.execute(_fan_out_statement(history_id, history_created_at))
         self.db.commit()
-        self.db.refresh(notification)
-        return notification
+        return result.rowcount
     
-    def get_by_user(self, user_id: int, limit: int = 500) -> List[Notification]:
-        return self.db.query(Notification).filter(
-            Notification.id_user == user_id
-        ).order_by(Notification.id_notification.desc()).limit(limit).all()
+    def get_by_user(
+        self,
+        user_id: int,
+        before_id: Optional[int] = None,
+        limit: int = 50,
+        since: Optional[datetime] = None
+    ):
+        """Notifikasi terbaru user.
+
+        Join ke history memakai kunci partisi; since membatasi created_at
+        history agar partisi yang lebih lama tidak ikut dibaca.
+        """
+        query = (
+            self.db.query(
+                Notification.id_notification,
+                History.id_history,
+                History.created_at,
+                History.note,
+                CctvCamera.id_cctv,
+                CctvCamera.titik_letak,
+                CctvCamera.ip_address,
+                Location.nama_lokasi,
+            )
+            .join(History, and_(
+                Notification.id_history == History.id_history,
+                Notification.history_created_at == History.created_at,
+            ))
+            .join(CctvCamera, History.id_cctv == CctvCamera.id_cctv)
+            .outerjoin(Location, CctvCamera.id_location == Location.id_location)
+            .filter(Notification.id_user == user_id)
+        )
+        if since is not None:
+            query = query.filter(History.created_at >= since, Notification.history_created_at >= since)
+        if before_id is not None:
+            query = query.filter(Notification.id_notification < before_id)
+        return query.order_by(Notification.id_notification.desc()).limit(limit).all()
     
     def delete(self, notification_id: int, user_id: int):
         notification = self.db.query(Notification).filter(
@@ -27,17 +77,110 @@ class NotificationRepository:
         ).first()
         if notification:
             self.db.delete(notification)
+            self.db.execute(
+                update(User)
+                .where(User.id_user == user_id)
+                .values(notification_count=func.greatest(User.notification_count - 1, 0))
+                .execution_options(synchronize_session=False)
+            )
             self.db.commit()
         return notification
     
-    def delete_all_by_user(self, user_id: int):
-        self.db.query(Notification).filter(
+    def delete_all_by_user(self, user_id: int) -> int:
+        deleted = self.db.query(Notification).filter(
             Notification.id_user == user_id
         ).delete()
+        self.db.execute(
+            update(User)
+            .where(User.id_user == user_id)
+            .values(notification_count=0)
+            .execution_options(synchronize_session=False)
+        )
         self.db.commit()
+        return deleted
     
     def count_by_user(self, user_id: int) -> int:
-        return self.db.query(Notification).filter(
-            Notification.id_user == user_id
-        ).count()
-    
+        count = self.db.query(User.notification_count).filter(
+            User.id_user == user_id
+        ).scalar()
+        return count or 0
+
+    def reconcile_counts(self) -> int:
+        actual = (
+            select(func.count(Notification.id_notification))
+            .where(Notification.id_user == User.id_user)
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            update(User)
+            .where(User.notification_count != actual)
+            .values(notification_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def get_expired_ids(
+        self,
+        cutoff: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+        since: Optional[datetime] = None
+    ) -> List[int]:
+        # waktu history disimpan di notifikasi, tidak perlu join ke history
+        query = (
+            self.db.query(Notification.id_notification)
+            .filter(Notification.history_created_at < cutoff, Notification.id_notification > after_id)
+        )
+        if since is not None:
+            query = query.filter(Notification.history_created_at >= since)
+        rows = query.order_by(Notification.id_notification).limit(limit).all()
+        return [row.id_notification for row in rows]
+
+    def get_user_ids_over_cap(self, max_per_user: int) -> List[int]:
+        rows = self.db.query(User.id_user).filter(User.notification_count > max_per_user).all()
+        return [row.id_user for row in rows]
+
+    def get_ids_over_cap(self, user_id: int, max_per_user: int, limit: int = 1000) -> List[int]:
+        rows = (
+            self.db.query(Notification.id_notification)
+            .filter(Notification.id_user == user_id)
+            .order_by(Notification.id_notification.desc())
+            .offset(max_per_user)
+            .limit(limit)
+            .all()
+        )
+        return [row.id_notification for row in rows]
+
+    def delete_batch(self, notification_ids: List[int]) -> int:
+        if not notification_ids:
+            return 0
+        deleted_users = self.db.execute(
+            delete(Notification)
+            .where(Notification.id_notification.in_(notification_ids))
+            .returning(Notification.id_user)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        per_user = dict(Counter(u for u in deleted_users if u is not None))
+        if per_user:
+            self.db.execute(
+                update(User)
+                .where(User.id_user.in_(list(per_user)))
+                .values(notification_count=func.greatest(
+                    User.notification_count - case(per_user, value=User.id_user, else_=0), 0
+                ))
+                .execution_options(synchronize_session=False)
+            )
+        self.db.commit()
+        return len(deleted_users)
+
+
+class AsyncNotificationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_for_active_users(self, history_id: int, history_created_at: datetime) -> int:
+        result = await self.db.execute(_fan_out_statement(history_id, history_created_at))
+        await self.db.commit()
+        return result.rowcount
@@ -0,0 +1,96 @@
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+
+def keyset_page(
+    query: Query,
+    column,
+    limit: int,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    descending: bool = True,
+    skip: int = 0
+):
+    """Ambil satu halaman dengan cursor pada primary key.
+
+    before_id/after_id memfilter lewat index primary key sehingga biaya
+    halaman tetap sama di kedalaman berapa pun. Hasil selalu dikembalikan
+    dalam urutan list (descending atau ascending).
+    """
+    if before_id is not None:
+        query = query.filter(column < before_id)
+    if after_id is not None:
+        query = query.filter(column > after_id)
+
+    # halaman ke arah cursor dibaca mulai dari cursor, lalu dibalik
+    reverse = (
+        after_id is not None and before_id is None
+        if descending
+        else before_id is not None and after_id is None
+    )
+    read_descending = descending != reverse
+    query = query.order_by(column.desc() if read_descending else column.asc())
+
+    if skip:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+    return rows[::-1] if reverse else rows
+
+
+def estimate_row_count(db: Session, table_name: str) -> int:
+    """Perkiraan jumlah baris dari statistik pg_class, tanpa COUNT(*).
+
+    Untuk tabel partisi yang dijumlahkan adalah partisi-partisinya.
+    """
+    return db.execute(text("""
+        SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint
+        FROM pg_class c
+        WHERE c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))
+           OR (c.oid = CAST(:table AS regclass) AND c.relkind <> 'p')
+    """), {"table": table_name}).scalar()
+
+
+def page_meta(
+    rows,
+    key: str,
+    limit: int,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    descending: bool = True,
+    estimated_total: Optional[int] = None
+) -> dict:
+    """Cursor halaman berikutnya/sebelumnya untuk response list.
+
+    before_id/after_id dari request menentukan arah baca, sama seperti di
+    keyset_page. Halaman yang dibaca mundur selalu punya cursor maju (data
+    sampai cursor request masih ada) dan cursor mundur hanya jika halaman
+    penuh; halaman pertama tidak punya cursor mundur.
+    """
+    forward_id, backward_id = (before_id, after_id) if descending else (after_id, before_id)
+    backward = backward_id is not None and forward_id is None
+    # geser satu agar halaman kosong tetap mengarah ke data di cursor request
+    step = 1 if descending else -1
+    first = getattr(rows[0], key) if rows else None
+    last = getattr(rows[-1], key) if rows else None
+    full = len(rows) == limit
+
+    if backward:
+        next_id = last if rows else backward_id + step
+        prev_id = first if full else None
+    else:
+        next_id = last if full else None
+        if forward_id is None:
+            prev_id = None
+        else:
+            prev_id = first if rows else forward_id - step
+
+    if descending:
+        cursors = {"next_before_id": next_id, "prev_after_id": prev_id}
+    else:
+        cursors = {"next_after_id": next_id, "prev_before_id": prev_id}
+
+    meta = {"limit": limit, **cursors}
+    if estimated_total is not None:
+        meta["estimated_total"] = estimated_total
+    return meta
@@ -0,0 +1,24 @@
+from sqlalchemy import func, or_
+
+
+def like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def trigram_match(columns: list, q: str):
+    """Cocok jika q muncul sebagai substring atau mirip secara trigram.
+
+    Kedua operator dilayani oleh index GIN gin_trgm_ops pada kolom tsb.
+    """
+    pattern = like_pattern(q)
+    return or_(*(
+        condition
+        for column in columns
+        for condition in (column.ilike(pattern, escape="\\"), column.op("%")(q))
+    ))
+
+
+def trigram_score(columns: list, q: str):
+    scores = [func.similarity(column, q) for column in columns]
+    return func.greatest(*scores) if len(scores) > 1 else scores[0]
@@ -1,18 +1,17 @@
-from.base import Session, User, CryptContext, Role
-from sqlalchemy import func
+from.base import Session, User, Role
+from.pagination import keyset_page, estimate_row_count
+from.search import trigram_match, trigram_score
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from core.security import verify_password
+from core.security import hash_password, verify_password
 from typing import List
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all(self, skip: int = 0, limit: int = 100):
-        return (
+    def get_all(self, before_id: int = None, after_id: int = None, limit: int = 100, skip: int = 0):
+        query = (
             self.db.query(
                 User.id_user,
                 User.nama,
@@ -20,17 +19,27 @@ class UserRepository:
                 User.username,
                 User.id_role,
                 Role.nama_role.label("user_role_name"),  
-                func.to_char(func.timezone('Asia/Jakarta', User.created_at), 'YYYY-MM-DD HH24:MI:SS').label("created_at"),
-                func.to_char(func.timezone('Asia/Jakarta', User.last_login), 'YYYY-MM-DD HH24:MI:SS').label("last_login"),
-                func.to_char(func.timezone('Asia/Jakarta', User.deleted_at), 'YYYY-MM-DD HH24:MI:SS').label("deleted_at"),
+                User.created_at,
+                User.last_login,
+                User.deleted_at,
             )
             .join(Role, User.id_role == Role.id_role)
             .where(User.deleted_at == None)
-            .order_by(User.id_user.desc())
-            .offset(skip)
+        )
+        return keyset_page(query, User.id_user, limit, before_id, after_id, skip=skip)
+
+    def estimate_total(self) -> int:
+        return estimate_row_count(self.db, User.__tablename__)
+
+    def search(self, q: str, limit: int = 20):
+        score = trigram_score([User.nama, User.username], q).label("score")
+        return (
+            self.db.query(User.id_user, User.nama, User.username, score)
+            .filter(User.deleted_at == None, trigram_match([User.nama, User.username], q))
+            .order_by(score.desc(), User.id_user.desc())
             .limit(limit)
             .all()
-    )
+        )
 
     def get_by_username(self, username: str):
         return self.db.query(User).filter(User.username == username).where(User.deleted_at == None).first()
@@ -46,7 +55,7 @@ class UserRepository:
         return self.db.query(User).filter(User.id_user == user_id).first()
     
     def create(self, user: User):
-        hashed_password = pwd_context.hash(user.password)
+        hashed_password = hash_password(user.password)
         db_user = User(
             nama = user.nama,
             nik = user.nik,
@@ -71,7 +80,7 @@ class UserRepository:
         if user.username:
             db_user.username = user.username
         if user.password:
-            db_user.password = pwd_context.hash(user.password)
+            db_user.password = hash_password(user.password)
         if user.id_role:
             db_user.id_role = user.id_role
         
@@ -100,6 +109,12 @@ class UserRepository:
     
     
     def get_all_for_export(self):
+        return self._export_query().all()
+
+    def iter_for_export(self, batch_size: int = 1000):
+        return self._export_query().yield_per(batch_size)
+
+    def _export_query(self):
         return (
             self.db.query(
                 User.nama,
@@ -110,7 +125,7 @@ class UserRepository:
             )
             .join(Role, User.id_role == Role.id_role)
             .where(User.deleted_at.is_(None))
-            .all()
+            .order_by(User.id_user)
     )
 
     def last_login(self, user_id:int):
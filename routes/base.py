@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, File, UploadFile, Query, Request, Body
 from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_read_db, get_async_db
 from core.auth import all_roles, superadmin_role
 from core.response import success_response
 from fastapi.responses import FileResponse
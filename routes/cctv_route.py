@@ -1,9 +1,14 @@
-from.base import APIRouter,File, Depends, UploadFile, Session, get_db, all_roles, superadmin_role, success_response
+from.base import Request, APIRouter,File, Depends, UploadFile, Query, Session, get_db, get_read_db, all_roles, superadmin_role, success_response
+from repositories.pagination import page_meta
 from.base import CctvRepository, LocationRepository
 from fastapi.responses import FileResponse
-from schemas.cctv_schemas import CctvCreate, CctvCreate1, CctvUpdate, CctvResponse
+from schemas.cctv_schemas import CctvCreate, CctvCreate1, CctvUpdate, CctvResponse, CctvDiscoveryRequest
 from services.cctv_service import CctvService
-from fastapi.responses import StreamingResponse
+from services.discovery_service import DiscoveryService
+from services.export_writer import EXPORT_FORMAT_PATTERN
+from core.export_cache import cached_export_response
+from services.import_preview import import_preview_cache
+from typing import Optional
 
 router = APIRouter(prefix="/cctv", tags=["cctv"])
 
@@ -13,18 +18,27 @@ def get_cctv_service(db: Session = Depends(get_db)):
     location_repo = LocationRepository(db)
     return CctvService(cctv_repo, location_repo)
 
+def get_cctv_read_service(db: Session = Depends(get_read_db)):
+    return CctvService(CctvRepository(db), LocationRepository(db))
+
 @router.get("/")
 def read_cctvs(
-    skip: int = 0,
-    limit: int = 500,
-    service: CctvService = Depends(get_cctv_service),
+    before_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih kecil dari cursor ini"),
+    after_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih besar dari cursor ini"),
+    limit: int = Query(500, gt=0, le=1000),
+    with_total: bool = Query(False, description="Sertakan perkiraan jumlah data dari statistik tabel"),
+    skip: int = Query(0, ge=0, deprecated=True),
+    subnet: Optional[str] = Query(None, description="Filter cctv dalam subnet, contoh 10.20.0.0/16"),
+    service: CctvService = Depends(get_cctv_read_service),
     user_role = Depends(all_roles)
 ):
-    cctvs = service.get_all_cctv(skip, limit)
+    cctvs = service.get_all_cctv(before_id, after_id, limit, skip, subnet)
     response_data = [CctvResponse.from_orm(loc) for loc in cctvs]
+    estimated_total = service.estimate_total() if with_total else None
     return success_response(
         message="Daftar semua cctv",
-        data=response_data
+        data=response_data,
+        meta=page_meta(cctvs, "id_cctv", limit, before_id, after_id, estimated_total=estimated_total)
     )
 
 
@@ -50,6 +64,23 @@ def create_cctv_analog(
         message="Cctv berhasil ditambahkan",
         data=CctvResponse.from_orm(created)
     )
+@router.post("/discover")
+async def discover_cctv(
+    payload: CctvDiscoveryRequest,
+    db: Session = Depends(get_db),
+    user_role = Depends(superadmin_role)
+):
+    service = DiscoveryService(CctvRepository(db))
+    result = await service.discover(payload.cidrs, payload.ports, payload.onvif, payload.timeout)
+    return success_response(
+        message=(
+            f"Pemindaian selesai: {result['scanned_hosts']} host, "
+            f"{len(result['new'])} baru, {len(result['missing'])} hilang, "
+            f"{len(result['moved'])} pindah"
+        ),
+        data=result
+    )
+
 @router.put("/{cctv_id}")
 def update_cctv(
     cctv_id: int,
@@ -77,41 +108,54 @@ def soft_delete_cctv(
 
 @router.get("/export")
 def export_cctv(
-    service: CctvService = Depends(get_cctv_service),
+    request: Request,
+    export_format: str = Query("xlsx", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="xlsx, csv (gzip), ndjson (gzip) atau parquet"),
+    service: CctvService = Depends(get_cctv_read_service),
     user_role = Depends(superadmin_role)
 ):
-    result = service.export_cctvs()
-    
-    return StreamingResponse(
-       content=result["data"],
-        headers={"Content-Disposition": f"attachment; filename={result['filename']}"},
-        media_type=result["media_type"]
+    return cached_export_response(
+        request,
+        "cctv",
+        {"format": export_format},
+        service.export_version(),
+        service.export_filename(export_format),
+        lambda: service.export_cctvs(export_format)
     )
 
 @router.post("/import")
 def import_cctv(
     file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Validasi dan tampilkan diff tanpa menyimpan"),
     service: CctvService = Depends(get_cctv_service),
     user_role = Depends(superadmin_role),
 ):
-    rows = service.parse_import_cctv(file)
-    result = service.import_cctvs(rows)
+    if dry_run:
+        rows, diff = service.preview_cctv_file(file)
+        # token hanya diberikan jika file bisa di-apply tanpa error
+        token = None if diff["errors"] else import_preview_cache.put("cctv", user_role["id_user"], rows)
+        return success_response(
+            message="Pratinjau import CCTV",
+            data={**diff, "token": token}
+        )
 
-    total_imported = len(result.get("imported", []))
-    total_updated = len(result.get("updated", []))
-    
+    result = service.import_cctv_file(file)
+    return _import_response(result)
+
+@router.post("/import/apply")
+def apply_import_cctv(
+    token: str = Query(..., description="Token dari import dry_run"),
+    service: CctvService = Depends(get_cctv_service),
+    user_role = Depends(superadmin_role),
+):
+    rows = import_preview_cache.pop(token, "cctv", user_role["id_user"])
+    return _import_response(service.apply_import(rows))
+
+def _import_response(result: dict):
     message = (
         f"Data CCTV berhasil diproses. "
-        f"Ditambahkan: {total_imported} data, "
-        f"Diperbarui: {total_updated} data."
+        f"Ditambahkan: {result['total_imported']} data, "
+        f"Diperbarui: {result['total_updated']} data."
     )
 
-    return success_response(
-        message=message,
-        data={
-            "total_processed": len(rows),
-            "total_imported": total_imported,
-            "total_updated": total_updated,
-        }
-    )
+    return success_response(message=message, data=result)
         
@@ -1,27 +1,38 @@
-from fastapi import APIRouter, Depends, Query, status, HTTPException
-from fastapi.responses import FileResponse
-import os
-from database import DatabaseService
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from database import DatabaseService, get_pool_stats
 from core.auth import superadmin_role
+from core.response import success_response
+from typing import Optional
 router = APIRouter(prefix="/db", tags=["Database Management"])
 
 @router.get("/export/sql")
-def export_sql_data(
+async def export_sql_data(
     table_name: str = Query(None, description="Nama tabel yang ingin diekspor (kosongkan untuk semua data)"),
+    dump_format: str = Query("custom", alias="format", pattern="^(custom|plain)$", description="custom (pg_restore) atau plain (SQL)"),
+    compression: Optional[str] = Query(None, pattern="^(gzip|zstd)$", description="Kompresi untuk format plain"),
     service = DatabaseService(),
     user_role = Depends(superadmin_role) 
 ):
-    try:
-        file_path = service.export_sql(table_name=table_name)
-        filename = os.path.basename(file_path)
-        
-        return FileResponse(
-            file_path, 
-            filename=filename, 
-            media_type="application/sql"
-        )
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+    dump = await service.stream_sql(
+        table_name=table_name,
+        dump_format=dump_format,
+        compression=compression
+    )
+    return StreamingResponse(
+        dump["data"],
+        media_type=dump["media_type"],
+        headers={"Content-Disposition": f"attachment; filename={dump['filename']}"},
+        # lock dump dilepas walaupun body tidak pernah mulai dikirim
+        background=BackgroundTask(dump["close"])
+    )
+
+@router.get("/pool")
+def read_pool_stats(
+    user_role = Depends(superadmin_role)
+):
+    return success_response(
+        message="Statistik connection pool",
+        data=get_pool_stats()
+    )
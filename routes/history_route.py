@@ -1,9 +1,12 @@
-from.base import APIRouter, Depends, Session, Query, get_db, all_roles, success_response
+from.base import Request, APIRouter, Depends, Session, Query, get_db, get_read_db, all_roles, success_response
 from.base import HistoryRepository, CctvRepository, UserRepository
 from schemas.history_schemas import HistoryResponse, HistoryCreate, HistoryUpdate
 from services.history_service import HistoryService
+from services.export_writer import EXPORT_FORMAT_PATTERN
+from core.export_cache import cached_export_response
+from repositories.pagination import page_meta
 from datetime import date, timedelta
-from fastapi.responses import StreamingResponse
+from typing import Optional
 
 router = APIRouter(prefix="/history", tags=["history"])
 
@@ -13,18 +16,26 @@ def get_history_service(db: Session = Depends(get_db)):
     user_repo = UserRepository(db)
     return HistoryService(history_repo, cctv_repo, user_repo)
 
+def get_history_read_service(db: Session = Depends(get_read_db)):
+    return HistoryService(HistoryRepository(db), CctvRepository(db), UserRepository(db))
+
 @router.get("")
 def read_history(
-    skip: int = 0,
-    limit: int = 1000,
-    service: HistoryService = Depends(get_history_service),
+    before_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih kecil dari cursor ini"),
+    after_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih besar dari cursor ini"),
+    limit: int = Query(1000, gt=0, le=1000),
+    with_total: bool = Query(False, description="Sertakan perkiraan jumlah data dari statistik tabel"),
+    skip: int = Query(0, ge=0, deprecated=True),
+    service: HistoryService = Depends(get_history_read_service),
     user_role = Depends(all_roles)
 ):
-    histories = service.get_all_hisotries(skip, limit)
+    histories = service.get_all_hisotries(before_id, after_id, limit, skip)
     response_data = [HistoryResponse.from_orm(loc) for loc in histories]
+    estimated_total = service.estimate_total() if with_total else None
     return success_response(
             message="Daftar semua history",
-            data=response_data
+            data=response_data,
+            meta=page_meta(histories, "id_history", limit, before_id, after_id, estimated_total=estimated_total)
     )
     
 @router.post("")
@@ -54,6 +65,7 @@ def update_history(
     
 @router.get("/export")
 def export_history(
+    request: Request,
     start_date: date = Query(
             default=date.today() - timedelta(days=7),
             description="Tanggal Mulai Filter (YYYY-MM-DD)"
@@ -62,14 +74,20 @@ def export_history(
         default=date.today(),
         description="Tanggal Akhir Filter (YYYY-MM-DD)"
     ),
-
-    service: HistoryService = Depends(get_history_service),
+    export_format: str = Query("xlsx", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="xlsx, csv (gzip), ndjson (gzip) atau parquet"),
+    service: HistoryService = Depends(get_history_read_service),
     user_role = Depends(all_roles)
 ):
     nama_user = user_role['nama']
-    result = service.export_history(start_date, end_date, nama_user)
-    return StreamingResponse(
-        content=result["data"],
-        headers={"Content-Disposition": f"attachment; filename={result['filename']}"},
-        media_type=result["media_type"]
+    params = {"start_date": start_date, "end_date": end_date, "format": export_format}
+    if export_format == "xlsx":
+        # header laporan xlsx memuat nama pembuat
+        params["nama_user"] = nama_user
+    return cached_export_response(
+        request,
+        "history",
+        params,
+        service.export_version(),
+        service.export_filename(start_date, end_date, export_format),
+        lambda: service.export_history(start_date, end_date, nama_user, export_format, include_export_time=False)
     )
\ No newline at end of file
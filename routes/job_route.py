@@ -0,0 +1,188 @@
+from.base import APIRouter, Depends, File, UploadFile, Query, Session, get_db, all_roles, superadmin_role, success_response
+from.base import CctvRepository, LocationRepository, HistoryRepository, UserRepository, RoleRepository
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse
+from repositories.job_repository import JobRepository
+from schemas.job_schemas import JobResponse
+from services.job_service import job_runner
+from services.cctv_service import CctvService
+from services.user_service import UserService
+from services.history_service import HistoryService
+from services.export_writer import EXPORT_FORMAT_PATTERN
+from database import DatabaseService
+from datetime import date, timedelta
+import os
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+FORMAT_QUERY = Query("xlsx", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="xlsx, csv (gzip), ndjson (gzip) atau parquet")
+
+
+def _accepted(job):
+    return success_response(
+        message="Job diterima, cek status di /jobs/{id_job}",
+        data=JobResponse.model_validate(job)
+    )
+
+
+def _import_task(path: str, filename: str, import_file):
+    def run(db, on_progress):
+        with open(path, "rb") as file:
+            return import_file(db, UploadFile(file, filename=filename), on_progress)
+    return run
+
+
+@router.post("/import/cctv", status_code=status.HTTP_202_ACCEPTED)
+def import_cctv_job(
+    file: UploadFile = File(...),
+    user_role = Depends(superadmin_role)
+):
+    path = job_runner.save_upload(file)
+    job = job_runner.submit(
+        "import_cctv",
+        {"filename": file.filename},
+        user_role["id_user"],
+        _import_task(
+            path, file.filename,
+            lambda db, upload, on_progress: CctvService(
+                CctvRepository(db), LocationRepository(db)
+            ).import_cctv_file(upload, on_progress)
+        ),
+        cleanup_path=path,
+    )
+    return _accepted(job)
+
+
+@router.post("/import/users", status_code=status.HTTP_202_ACCEPTED)
+def import_users_job(
+    file: UploadFile = File(...),
+    user_role = Depends(superadmin_role)
+):
+    path = job_runner.save_upload(file)
+    job = job_runner.submit(
+        "import_users",
+        {"filename": file.filename},
+        user_role["id_user"],
+        _import_task(
+            path, file.filename,
+            lambda db, upload, on_progress: UserService(
+                UserRepository(db), RoleRepository(db)
+            ).import_user_file(upload, on_progress)
+        ),
+        cleanup_path=path,
+    )
+    return _accepted(job)
+
+
+@router.post("/export/cctv", status_code=status.HTTP_202_ACCEPTED)
+def export_cctv_job(
+    export_format: str = FORMAT_QUERY,
+    user_role = Depends(superadmin_role)
+):
+    job = job_runner.submit(
+        "export_cctv",
+        {"format": export_format},
+        user_role["id_user"],
+        lambda db, on_progress: CctvService(
+            CctvRepository(db), LocationRepository(db)
+        ).export_cctvs(export_format)
+    )
+    return _accepted(job)
+
+
+@router.post("/export/users", status_code=status.HTTP_202_ACCEPTED)
+def export_users_job(
+    export_format: str = FORMAT_QUERY,
+    user_role = Depends(superadmin_role)
+):
+    job = job_runner.submit(
+        "export_users",
+        {"format": export_format},
+        user_role["id_user"],
+        lambda db, on_progress: UserService(
+            UserRepository(db), RoleRepository(db)
+        ).export_users(export_format)
+    )
+    return _accepted(job)
+
+
+@router.post("/export/history", status_code=status.HTTP_202_ACCEPTED)
+def export_history_job(
+    start_date: date = Query(
+        default=date.today() - timedelta(days=7),
+        description="Tanggal Mulai Filter (YYYY-MM-DD)"
+    ),
+    end_date: date = Query(
+        default=date.today(),
+        description="Tanggal Akhir Filter (YYYY-MM-DD)"
+    ),
+    export_format: str = FORMAT_QUERY,
+    user_role = Depends(all_roles)
+):
+    nama_user = user_role["nama"]
+    job = job_runner.submit(
+        "export_history",
+        {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(), "format": export_format},
+        user_role["id_user"],
+        lambda db, on_progress: HistoryService(
+            HistoryRepository(db), CctvRepository(db), UserRepository(db)
+        ).export_history(start_date, end_date, nama_user, export_format)
+    )
+    return _accepted(job)
+
+
+@router.post("/db/dump", status_code=status.HTTP_202_ACCEPTED)
+def dump_database_job(
+    table_name: str = Query(None, description="Nama tabel yang ingin diekspor (kosongkan untuk semua data)"),
+    user_role = Depends(superadmin_role)
+):
+    def run(db, on_progress):
+        path = DatabaseService().export_sql(table_name=table_name)
+        return {"path": path, "filename": os.path.basename(path), "media_type": "application/sql"}
+
+    job = job_runner.submit("db_dump", {"table_name": table_name}, user_role["id_user"], run)
+    return _accepted(job)
+
+
+def _get_own_job(id_job: str, db: Session, current_user: dict):
+    job = JobRepository(db).get_by_id(id_job)
+    # job milik user lain hanya bisa dilihat superadmin
+    if not job or (job.id_user != current_user["id_user"] and current_user["id_role"] != 1):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job tidak ditemukan"
+        )
+    return job
+
+
+@router.get("/{id_job}")
+def read_job(
+    id_job: str,
+    db: Session = Depends(get_db),
+    user_role = Depends(all_roles)
+):
+    job = _get_own_job(id_job, db, user_role)
+    return success_response(
+        message="Status job",
+        data=JobResponse.model_validate(job)
+    )
+
+
+@router.get("/{id_job}/result")
+def download_job_result(
+    id_job: str,
+    db: Session = Depends(get_db),
+    user_role = Depends(all_roles)
+):
+    job = _get_own_job(id_job, db, user_role)
+    if not job.result_path:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job berstatus {job.status.value}, belum ada file hasil"
+        )
+    if not os.path.exists(job.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="File hasil job sudah kedaluwarsa"
+        )
+    return FileResponse(job.result_path, filename=job.result_filename, media_type=job.media_type)
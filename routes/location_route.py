@@ -1,7 +1,9 @@
-from.base import APIRouter, Depends, Session, get_db, superadmin_role, all_roles, success_response
+from.base import APIRouter, Depends, Query, Session, get_db, get_read_db, superadmin_role, all_roles, success_response
 from.base import LocationRepository
 from schemas.location_schemas import LocationResponse, LocationCreate, LocationUpdate
 from services.location_service import LocationService
+from repositories.pagination import page_meta
+from typing import Optional
 
 router = APIRouter(prefix="/location", tags=["locations"])
 
@@ -9,18 +11,26 @@ def get_location_service(db: Session = Depends(get_db)):
     location_repository = LocationRepository(db)
     return LocationService(location_repository)
 
+def get_location_read_service(db: Session = Depends(get_read_db)):
+    return LocationService(LocationRepository(db))
+
 @router.get("/")
 def read_location(
-    skip: int = 0,
-    limit: int = 50,
-    service: LocationService = Depends(get_location_service),
+    before_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih kecil dari cursor ini"),
+    after_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih besar dari cursor ini"),
+    limit: int = Query(50, gt=0, le=1000),
+    with_total: bool = Query(False, description="Sertakan perkiraan jumlah data dari statistik tabel"),
+    skip: int = Query(0, ge=0, deprecated=True),
+    service: LocationService = Depends(get_location_read_service),
     user_role = Depends(all_roles)
 ):
-    locations = service.get_all_location(skip, limit)
+    locations = service.get_all_location(before_id, after_id, limit, skip)
     response_data = [LocationResponse.from_orm(loc) for loc in locations]
+    estimated_total = service.estimate_total() if with_total else None
     return success_response(
             message="Daftar semua lokasi",
-            data=response_data
+            data=response_data,
+            meta=page_meta(locations, "id_location", limit, before_id, after_id, descending=False, estimated_total=estimated_total)
         )
 
 
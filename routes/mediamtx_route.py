@@ -1,18 +1,20 @@
-from.base import APIRouter, Depends, Session,  get_db, all_roles, success_response
-from.base import CctvRepository, LocationRepository, HistoryRepository, UserRepository, NotificationRepository
+from.base import APIRouter, Depends, AsyncSession, get_async_db, all_roles, success_response
+from repositories.cctv_repository import AsyncCctvRepository
+from repositories.location_repository import AsyncLocationRepository
+from repositories.history_repository import AsyncHistoryRepository
+from repositories.notification_repository import AsyncNotificationRepository
 from services.mediamtx_service import StreamService
-from services.notification_service import NotificationService
+from services.notification_service import AsyncNotificationService
 from schemas.cctv_schemas import CctvIdsPayload
 router = APIRouter(prefix="/streams", tags=["streams"])
 
 
-def get_stream_service(db: Session = Depends(get_db)):
-    cctv_repo = CctvRepository(db)
-    location_repo = LocationRepository(db)
-    history_repo = HistoryRepository(db)
-    user_repo = UserRepository(db)
-    notification_repo = NotificationRepository(db)
-    notification_service = NotificationService(notification_repo, history_repo, cctv_repo, user_repo)
+def get_stream_service(db: AsyncSession = Depends(get_async_db)):
+    cctv_repo = AsyncCctvRepository(db)
+    location_repo = AsyncLocationRepository(db)
+    history_repo = AsyncHistoryRepository(db)
+    notification_repo = AsyncNotificationRepository(db)
+    notification_service = AsyncNotificationService(notification_repo, history_repo)
     return StreamService(cctv_repo, history_repo, location_repo, notification_service)
 
 
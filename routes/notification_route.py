@@ -1,7 +1,8 @@
-from.base import APIRouter, Depends, Session, get_db, all_roles, success_response
+from.base import APIRouter, Depends, Session, Query, get_db, get_read_db, all_roles, success_response
 from.base import NotificationRepository, HistoryRepository, CctvRepository, UserRepository
 from services.notification_service import NotificationService
 from schemas.notification_schemas import NotificationResponse
+from typing import Optional
 import logging
 logger = logging.getLogger(__name__)
 
@@ -14,13 +15,18 @@ def get_notification_service(db: Session = Depends(get_db)):
     user_repo = UserRepository(db)
     return NotificationService(notification_repo, history_repo, cctv_repo, user_repo)
 
+def get_notification_read_service(db: Session = Depends(get_read_db)):
+    return NotificationService(NotificationRepository(db), HistoryRepository(db), CctvRepository(db), UserRepository(db))
+
 @router.get("/")
 def get_notifications(
-    service: NotificationService = Depends(get_notification_service),
+    before_id: Optional[int] = Query(None, gt=0, description="Ambil notifikasi sebelum id ini"),
+    limit: int = Query(50, gt=0, le=500),
+    service: NotificationService = Depends(get_notification_read_service),
     user_role = Depends(all_roles)
 ):
     user_id = user_role['id_user']
-    notifications = service.get_user_notifications(user_id)
+    notifications = service.get_user_notifications(user_id, before_id, limit)
     response_data = [NotificationResponse.from_orm(loc) for loc in notifications]
     return success_response(
         message="Daftar notifikasi berhasil ditampilkan",
@@ -0,0 +1,22 @@
+from.base import APIRouter, Depends, Query, Session, get_read_db, all_roles, success_response
+from.base import CctvRepository, LocationRepository, UserRepository
+from services.search_service import SearchService
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+def get_search_service(db: Session = Depends(get_read_db)):
+    return SearchService(CctvRepository(db), LocationRepository(db), UserRepository(db))
+
+@router.get("")
+def search(
+    q: str = Query(..., min_length=2, max_length=100, description="Kata kunci: titik letak, IP, lokasi, nama atau username"),
+    limit: int = Query(20, gt=0, le=100),
+    service: SearchService = Depends(get_search_service),
+    user_role = Depends(all_roles)
+):
+    # data user hanya untuk superadmin
+    results = service.search(q, limit, include_users=user_role['id_role'] == 1)
+    return success_response(
+        message=f"Hasil pencarian '{q}'",
+        data=results
+    )
@@ -1,10 +1,14 @@
-from.base import APIRouter, Depends, Session, get_db, success_response, File, UploadFile
+from.base import Request, APIRouter, Depends, Query, Session, get_db, get_read_db, success_response, File, UploadFile
+from repositories.pagination import page_meta
+from typing import Optional
 from repositories.user_repository import UserRepository
 from repositories.role_repository import RoleRepository
 from schemas.user_schemas import UserResponse, UserCreate, UserUpdate
 from services.user_service import UserService
+from services.export_writer import EXPORT_FORMAT_PATTERN
+from core.export_cache import cached_export_response
+from services.import_preview import import_preview_cache
 from core.auth import superadmin_role
-from fastapi.responses import StreamingResponse
 router = APIRouter(prefix="/users", tags=["users"])
 
 def get_user_service(db: Session = Depends(get_db)):
@@ -12,18 +16,26 @@ def get_user_service(db: Session = Depends(get_db)):
     role_repo = RoleRepository(db)
     return UserService(user_repo, role_repo)
 
+def get_user_read_service(db: Session = Depends(get_read_db)):
+    return UserService(UserRepository(db), RoleRepository(db))
+
 @router.get("/", response_model=dict)
 def read_users(
-    skip: int = 0,
-    limit: int = 100,
+    before_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih kecil dari cursor ini"),
+    after_id: Optional[int] = Query(None, gt=0, description="Ambil data dengan id lebih besar dari cursor ini"),
+    limit: int = Query(100, gt=0, le=1000),
+    with_total: bool = Query(False, description="Sertakan perkiraan jumlah data dari statistik tabel"),
+    skip: int = Query(0, ge=0, deprecated=True),
     service: UserService = Depends(get_user_service),
     user_role = Depends(superadmin_role)
 ):
-    users = service.get_all_users(skip, limit)
+    users = service.get_all_users(before_id, after_id, limit, skip)
     response_data = [UserResponse.from_orm(user) for user in users]
+    estimated_total = service.estimate_total() if with_total else None
     return success_response(
         message="Daftar semua users", 
-        data=response_data
+        data=response_data,
+        meta=page_meta(users, "id_user", limit, before_id, after_id, estimated_total=estimated_total)
     )
 
 @router.post("/")
@@ -76,31 +88,49 @@ def hard_delete_user(
     )
 @router.get("/export")
 def export_users(
-    service: UserService = Depends(get_user_service),
+    request: Request,
+    export_format: str = Query("xlsx", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="xlsx, csv (gzip), ndjson (gzip) atau parquet"),
+    service: UserService = Depends(get_user_read_service),
     user_role = Depends(superadmin_role)
 ):
-    result = service.export_users()
-    
-    return StreamingResponse(
-        content=result["data"],
-        headers={"Content-Disposition": f"attachment; filename={result['filename']}"},
-        media_type=result["media_type"]
+    return cached_export_response(
+        request,
+        "users",
+        {"format": export_format},
+        service.export_version(),
+        service.export_filename(export_format),
+        lambda: service.export_users(export_format)
     )
 
 @router.post("/import")
 def import_users(
     file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Validasi dan tampilkan diff tanpa menyimpan"),
+    service: UserService = Depends(get_user_service),
+    user_role = Depends(superadmin_role)
+):
+    if dry_run:
+        rows, diff = service.preview_user_file(file)
+        # token hanya diberikan jika file bisa di-apply tanpa error
+        token = None if diff["errors"] else import_preview_cache.put("users", user_role["id_user"], rows)
+        return success_response(
+            message="Pratinjau import user",
+            data={**diff, "token": token}
+        )
+
+    return _import_response(service.import_user_file(file))
+
+@router.post("/import/apply")
+def apply_import_users(
+    token: str = Query(..., description="Token dari import dry_run"),
     service: UserService = Depends(get_user_service),
     user_role = Depends(superadmin_role)
 ):
-    rows = service.parse_import_user(file)
-    imported = service.import_users(rows)
-    total_imported = len(imported.get("imported", []))
-    total_updated = len(imported.get("updated", []))
+    rows = import_preview_cache.pop(token, "users", user_role["id_user"])
+    return _import_response(service.apply_import(rows))
+
+def _import_response(result: dict):
     return success_response(
-        message=f"Ditambahkan: {total_imported}, Diperbarui: {total_updated}",
-        data={
-            "total_imported": total_imported,
-            "total_updated": total_updated,
-        }
+        message=f"Ditambahkan: {result['total_imported']}, Diperbarui: {result['total_updated']}",
+        data=result
     )
\ No newline at end of file
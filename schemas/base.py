@@ -1,3 +1,16 @@
-from pydantic import BaseModel, Field, field_validator, ConfigDict, constr, StringConstraints
+from pydantic import BaseModel, Field, field_validator, ConfigDict, constr, StringConstraints, PlainSerializer
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Annotated
+from zoneinfo import ZoneInfo
+from core.config import settings
+
+
+def _serialize_local_datetime(value: datetime) -> str:
+    # repository mengembalikan timestamptz apa adanya, konversi ke zona
+    # waktu aplikasi dilakukan sekali di sini saat response dibuat
+    if value.tzinfo is not None:
+        value = value.astimezone(ZoneInfo(settings.TIMEZONE)).replace(tzinfo=None)
+    return value.replace(microsecond=0).isoformat()
+
+
+LocalDatetime = Annotated[datetime, PlainSerializer(_serialize_local_datetime, return_type=str, when_used="json")]
@@ -1,8 +1,9 @@
 from typing import List
 from pydantic.types import StrictBool
-from.base import BaseModel, datetime, Optional, Field, field_validator
+from.base import BaseModel, datetime, LocalDatetime, Optional, Field, field_validator
 from typing import List
-from ipaddress import IPv4Address
+from ipaddress import IPv4Address, IPv4Network
+from models.cctv_model import CameraType
 
 class CctvBase(BaseModel):
     titik_letak: Optional[str] = Field(min_length=3, max_length=50)
@@ -35,7 +36,7 @@ class CctvCreate1(BaseModel):
             return v
         except ValueError:
             raise ValueError('ip_address harus berupa format IPv4 yang valid.')
-    nama_lokasi: str = Field(min_length=5, max_length=200)
+    nama_lokasi: str = Field(min_length=5, max_length=50)
 class CctvCreate(CctvBase):
     pass
 
@@ -65,10 +66,11 @@ class CctvUpdate(BaseModel):
 class CctvResponse(CctvBase):
     id_cctv: int
     is_streaming: Optional[bool] = None
+    camera_type: Optional[CameraType] = None
     cctv_location_name: Optional[str] = None
-    created_at: Optional[datetime]= None
-    updated_at: Optional[datetime]= None
-    deleted_at: Optional[datetime]= None
+    created_at: Optional[LocalDatetime] = None
+    updated_at: Optional[LocalDatetime] = None
+    deleted_at: Optional[LocalDatetime] = None
     class Config:
         from_attributes = True
 
@@ -83,4 +85,25 @@ class StreamUrlsResponse(BaseModel):
 
 class CctvIdsPayload(BaseModel):
     # Menggunakan anotasi tipe yang benar
-    cctv_ids: List[int] = Field(..., max_length=16, description="Daftar ID CCTV, maks 16 ID")
\ No newline at end of file
+    cctv_ids: List[int] = Field(..., max_length=16, description="Daftar ID CCTV, maks 16 ID")
+
+class CctvDiscoveryRequest(BaseModel):
+    cidrs: List[str] = Field(..., min_length=1, max_length=16, description="Daftar subnet IPv4, contoh 10.20.0.0/22")
+    ports: List[int] = Field(default=[554, 80], min_length=1, max_length=8)
+    onvif: bool = Field(False, description="Kirim probe ONVIF WS-Discovery")
+    timeout: float = Field(1.0, gt=0, le=10, description="Timeout per koneksi (detik)")
+    @field_validator('cidrs')
+    @classmethod
+    def validate_cidrs(cls, v):
+        for cidr in v:
+            try:
+                IPv4Network(cidr, strict=False)
+            except ValueError:
+                raise ValueError(f'cidr tidak valid: {cidr}')
+        return v
+    @field_validator('ports')
+    @classmethod
+    def validate_ports(cls, v):
+        if any(port < 1 or port > 65535 for port in v):
+            raise ValueError('port harus di antara 1 dan 65535')
+        return v
@@ -1,4 +1,4 @@
-from.base import BaseModel, Optional, datetime, Field
+from.base import BaseModel, Optional, datetime, LocalDatetime, Field
 
 class HistoryBase(BaseModel):
     id_cctv: int = Field(gt=0)
@@ -15,7 +15,7 @@ class HistoryResponse(HistoryBase):
     id_history: int
     service: bool
     status: bool
-    created_at: Optional[datetime]= None
+    created_at: Optional[LocalDatetime] = None
     cctv_name: Optional[str] = None
     cctv_ip: Optional[str] = None
     location_name: Optional[str] = None
@@ -0,0 +1,18 @@
+from.base import BaseModel, LocalDatetime, Optional
+from models.job_model import JobStatus
+
+class JobResponse(BaseModel):
+    id_job: str
+    job_type: str
+    status: JobStatus
+    params: Optional[dict] = None
+    progress: Optional[dict] = None
+    result: Optional[dict] = None
+    result_filename: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[LocalDatetime] = None
+    started_at: Optional[LocalDatetime] = None
+    finished_at: Optional[LocalDatetime] = None
+    expires_at: Optional[LocalDatetime] = None
+    class Config:
+        from_attributes = True
@@ -9,6 +9,7 @@ class NotificationResponse(BaseModel):
     note: Optional[str]
     titik_letak: str
     ip_address: str
+    nama_lokasi: Optional[str] = None
 
     class Config:
     
@@ -1,11 +1,12 @@
-from.base import BaseModel, datetime, Optional, Field, StringConstraints
+from.base import BaseModel, datetime, LocalDatetime, Optional, Field, StringConstraints
 from typing import Annotated
+NIK_PATTERN = r'^\d{4,5}\.\d{5,6}$'
 NIK_Type = Annotated[
     str, 
     StringConstraints(
         min_length=9, 
         max_length=11, 
-        pattern=r'^\d{4,5}\.\d{5,6}$'
+        pattern=NIK_PATTERN
     )
 ]
 class UserBase(BaseModel):
@@ -33,8 +34,8 @@ class UserResponse(UserBase):
     id_user: int
     id_role: int
     user_role_name: Optional[str] = None
-    created_at: Optional[datetime]= None
-    last_login: Optional[datetime]= None
-    deleted_at: Optional[datetime]= None
+    created_at: Optional[LocalDatetime] = None
+    last_login: Optional[LocalDatetime] = None
+    deleted_at: Optional[LocalDatetime] = None
     class Config:
         from_attributes = True
\ No newline at end of file
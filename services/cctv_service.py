@@ -1,24 +1,64 @@
 from repositories.cctv_repository import CctvRepository
 from repositories.location_repository import LocationRepository
+from repositories.data_version_repository import DataVersionRepository
+from models.cctv_model import CameraType
 from schemas.cctv_schemas import CctvCreate, CctvCreate1, CctvUpdate
 from fastapi import HTTPException, status
 from datetime import datetime
-from io import BytesIO
-import pandas as pd
+from ipaddress import IPv4Network
 import logging
-from pydantic import ValidationError
 # from typing import Dict
 import uuid
+from typing import Callable
+from services.import_reader import iter_import_chunks
+from services.import_preview import add_to_diff, chunked, field_changes, new_diff
+from services.import_validation import (
+    collect_errors, duplicate_errors, first_error, import_frame, ipv4_errors,
+    missing_errors, string_errors
+)
+from services.export_writer import (
+    ExportColumn, STREAM_FORMATS, XLSX_MEDIA_TYPE,
+    export_filename, iter_file, iter_rows, parquet_export, stream_export, write_xlsx
+)
 logger = logging.getLogger(__name__)
 
+# file import memakai header yang sama dengan file export
+CCTV_IMPORT_COLUMNS = {
+    "titik letak": "titik_letak",
+    "ip address": "ip_address",
+    "server monitoring": "nama_lokasi",
+}
+
+CCTV_EXPORT_COLUMNS = [
+    ExportColumn("titik_letak", "Titik Letak"),
+    ExportColumn("ip_address", "Ip Address"),
+    ExportColumn("cctv_location_name", "Server Monitoring"),
+]
+
+
+def import_conflict_error(row: int, first_row: int) -> str:
+    # satu baris cocok lewat IP, baris lain lewat titik letak ke cctv yang sama
+    return f"Baris {row}: cocok dengan cctv yang sama dengan baris {first_row} (lewat IP atau titik letak)"
+
 class CctvService:  
   
     def __init__(self, cctv_repository: CctvRepository, location_repository: LocationRepository):
         self.cctv_repository = cctv_repository
         self.location_repository= location_repository
 
-    def get_all_cctv(self, skip: int = 0, limit: int = 500 ):
-        return self.cctv_repository.get_all(skip, limit)
+    def get_all_cctv(self, before_id: int = None, after_id: int = None, limit: int = 500, skip: int = 0, subnet: str = None):
+        if subnet:
+            try:
+                subnet = str(IPv4Network(subnet, strict=False))
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Subnet tidak valid: {subnet}"
+                )
+        return self.cctv_repository.get_all(before_id, after_id, limit, skip, subnet)
+
+    def estimate_total(self) -> int:
+        return self.cctv_repository.estimate_total()
        
     def create_cctv_ip(self, cctv: CctvCreate):
         existing_ip = self.cctv_repository.get_by_ip(cctv.ip_address)
@@ -50,7 +90,8 @@ class CctvService:
             "ip_address": cctv.ip_address,
             "id_location": cctv.id_location,
             "stream_key": stream_key,
-            "is_streaming": False
+            "is_streaming": False,
+            "camera_type": CameraType.ip
         }
 
         try:
@@ -95,7 +136,8 @@ class CctvService:
             "ip_address": cctv.ip_address,
             "id_location": create_location.id_location,
             "stream_key": None,
-            "is_streaming": True
+            "is_streaming": True,
+            "camera_type": CameraType.analog
         }
 
         try:
@@ -165,64 +207,178 @@ class CctvService:
             )
         return cctv
         
-    def export_cctvs(self):
-        data = self.cctv_repository.get_all_for_export()
-        df = pd.DataFrame([dict(row._mapping) for row in data])
-        df.rename(columns={
-            'titik_letak': 'Titik Letak',
-            'ip_address': 'Ip Address',
-            'cctv_location_name': 'Server Monitoring'
-        }, inplace=True)
-
-        unique_time = datetime.now().strftime("%Y%m%d%H%M%S") 
-
-        output = BytesIO() 
-        
-        df.to_excel(output, index=False)
-        
-        output.seek(0)
+    def export_version(self) -> dict:
+        return DataVersionRepository(self.cctv_repository.db).get_versions(["cctv_camera", "location"])
+
+    @staticmethod
+    def export_filename(export_format: str = "xlsx") -> str:
+        return export_filename(CctvService._export_stem(), export_format)
+
+    @staticmethod
+    def _export_stem() -> str:
+        unique_time = datetime.now().strftime("%Y%m%d%H%M%S")
+        return f"Cctvs_export_{unique_time}"
+
+    def export_cctvs(self, export_format: str = "xlsx"):
+        filename = self._export_stem()
+        if export_format in STREAM_FORMATS:
+            rows = iter_rows(
+                self.cctv_repository.db.get_bind(),
+                lambda db: CctvRepository(db).iter_for_export()
+            )
+            return stream_export(export_format, rows, CCTV_EXPORT_COLUMNS, filename)
+        if export_format == "parquet":
+            return parquet_export(self.cctv_repository.iter_for_export(), CCTV_EXPORT_COLUMNS, filename)
+
+        output = write_xlsx(self.cctv_repository.iter_for_export(), CCTV_EXPORT_COLUMNS)
 
         return {
-            "data": output, 
-            "filename": f"Cctvs_export_{unique_time}.xlsx",
-            "media_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            "data": iter_file(output), 
+            "filename": export_filename(filename, export_format),
+            "media_type": XLSX_MEDIA_TYPE
         }
     
     @staticmethod
-    def parse_import_cctv(uploaded_file):
-        contents = uploaded_file.file.read()
-        df = pd.read_excel(BytesIO(contents))
-        
-        rows = df.rename(columns={
-            "Titik Letak": "titik_letak",
-            "Ip Address": "ip_address",
-            "Server Monitoring": "server_monitoring"
-        }).to_dict('records')
-        
-        validated_rows = []
-        errors = []
-        
-        for idx, row in enumerate(rows, start=2):  
-            try:
-                cctv = CctvCreate1(
-                    titik_letak=row["titik_letak"],
-                    ip_address=row["ip_address"],
-                    nama_lokasi=row["server_monitoring"]
+    def camera_type_for(titik_letak: str) -> CameraType:
+        # file import mengikuti penamaan "Analog <lokasi>" dari create_cctv_analog
+        if titik_letak and titik_letak.lower().startswith("analog"):
+            return CameraType.analog
+        return CameraType.ip
+
+    @staticmethod
+    def validate_import_chunk(chunk: list[dict], seen: dict) -> tuple[list[dict], list[str]]:
+        """Validasi satu chunk baris import per kolom.
+
+        Aturan dan pesan error sama dengan CctvCreate1, tapi dicek sekaligus
+        untuk seluruh kolom; model Pydantic hanya dibuat untuk baris yang
+        valid. seen menyimpan IP dan titik letak dari chunk sebelumnya
+        (nilai -> nomor baris) untuk cek duplikasi di dalam file.
+        """
+        frame = import_frame(chunk, list(CCTV_IMPORT_COLUMNS))
+        titik_letak = frame["titik letak"]
+        ip_address = frame["ip address"]
+
+        field_errors = first_error(
+            string_errors(titik_letak, 3, 50, required=False),
+            string_errors(ip_address, 7, 15),
+            ipv4_errors(ip_address, "Value error, ip_address harus berupa format IPv4 yang valid."),
+            string_errors(frame["server monitoring"], 5, 50),
+            missing_errors(titik_letak, "Titik letak wajib diisi"),
+        )
+        valid = field_errors.isna()
+        duplicate_ip = duplicate_errors(frame, valid, "ip address", "IP", seen["ip_address"])
+        duplicate_titik = duplicate_errors(frame, valid, "titik letak", "Titik Letak", seen["titik_letak"])
+
+        errors = collect_errors(frame, field_errors, duplicate_ip, duplicate_titik)
+        valid &= duplicate_ip.isna() & duplicate_titik.isna()
+        records = frame.loc[valid, ["_row", *CCTV_IMPORT_COLUMNS]].rename(columns=CCTV_IMPORT_COLUMNS)
+        # nomor baris ikut disimpan untuk pesan konflik saat upsert
+        validated_rows = [
+            {"_row": record.pop("_row"), **CctvCreate1.model_construct(**record).model_dump()}
+            for record in records.to_dict("records")
+        ]
+        return validated_rows, errors
+
+    def _validated_chunks(self, uploaded_file):
+        seen = {"ip_address": {}, "titik_letak": {}}
+        for chunk in iter_import_chunks(uploaded_file, list(CCTV_IMPORT_COLUMNS)):
+            rows, errors = self.validate_import_chunk(chunk, seen)
+            if errors:
+                raise HTTPException(
+                    status_code=400,
+                    detail={"message": "Data tidak valid", "errors": errors}
                 )
-                validated_rows.append(cctv.model_dump())
-            except Exception as e:
-                errors.append(f"Baris {idx}: {e.errors()[0]['msg']}")
-        
-        if errors:
-            raise HTTPException(
-                status_code=400,
-                detail={"message": "Data tidak valid", "errors": errors}
+            yield rows
+
+    def import_cctv_file(self, uploaded_file, on_progress: Callable[[dict], None] = None) -> dict:
+        """Import cctv dari xlsx/csv per chunk dalam satu transaksi.
+
+        Berhenti di chunk pertama yang berisi error, sehingga error dikembalikan
+        tanpa membaca sisa file; seluruh perubahan di-rollback.
+        """
+        return self._run_import(self._validated_chunks(uploaded_file), on_progress)
+
+    def apply_import(self, rows: list[dict]) -> dict:
+        """Import baris hasil dry-run yang sudah divalidasi."""
+        return self._run_import(chunked(rows))
+
+    def preview_cctv_file(self, uploaded_file) -> tuple[list[dict], dict]:
+        """Dry-run import: validasi seluruh file dan hitung diff tanpa menulis.
+
+        Berbeda dengan import biasa, semua error dikumpulkan agar bisa
+        diperbaiki sekaligus.
+        """
+        seen = {"ip_address": {}, "titik_letak": {}}
+        rows = []
+        diff = new_diff()
+        for chunk in iter_import_chunks(uploaded_file, list(CCTV_IMPORT_COLUMNS)):
+            valid_rows, errors = self.validate_import_chunk(chunk, seen)
+            diff["errors"].extend(errors)
+            rows.extend(valid_rows)
+
+        for chunk in chunked(rows):
+            matches = self.cctv_repository.get_import_matches(
+                [row["ip_address"] for row in chunk],
+                [row["titik_letak"] for row in chunk]
             )
-            
-        return validated_rows
+            by_ip = {match.ip_address: match for match in matches}
+            by_pos = {match.titik_letak: match for match in matches}
+            matched_rows = {}
 
-        
-    def import_cctvs(self, rows: list[dict]):
+            for row in chunk:
+                new = {key: value for key, value in row.items() if key != "_row"}
+                new["camera_type"] = self.camera_type_for(row["titik_letak"]).value
+                existing = by_ip.get(row["ip_address"]) or by_pos.get(row["titik_letak"])
+                if not existing:
+                    add_to_diff(diff, "creates", new)
+                    continue
+                if existing.id_cctv in matched_rows:
+                    diff["errors"].append(import_conflict_error(row["_row"], matched_rows[existing.id_cctv]))
+                    continue
+                matched_rows[existing.id_cctv] = row["_row"]
+                current = {
+                    "titik_letak": existing.titik_letak,
+                    "ip_address": existing.ip_address,
+                    "nama_lokasi": existing.nama_lokasi,
+                    "camera_type": existing.camera_type.value,
+                }
+                changes = field_changes(current, new)
+                if changes:
+                    add_to_diff(diff, "updates", {"id_cctv": existing.id_cctv, **current, "perubahan": changes})
+                else:
+                    diff["unchanged"] += 1
+
+        return rows, diff
+
+    def _run_import(self, chunks, on_progress: Callable[[dict], None] = None) -> dict:
+        summary = {"total_processed": 0, "total_imported": 0, "total_updated": 0, "chunks": []}
+        db = self.cctv_repository.db
+
+        try:
+            for number, rows in enumerate(chunks, start=1):
+                result = self.import_cctvs(rows, commit=False)
+                progress = {
+                    "chunk": number,
+                    "rows": len(rows),
+                    "imported": result["imported"],
+                    "updated": result["updated"],
+                }
+                summary["total_processed"] += progress["rows"]
+                summary["total_imported"] += progress["imported"]
+                summary["total_updated"] += progress["updated"]
+                summary["chunks"].append(progress)
+                logger.info(f"Import cctv chunk {number}: {progress}")
+                if on_progress:
+                    on_progress({**progress, "total_processed": summary["total_processed"]})
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return summary
+
+    def import_cctvs(self, rows: list[dict], commit: bool = True):
         ip_cek = {}
         titik_cek = {}
 
@@ -249,73 +405,23 @@ class CctvService:
                     "errors": internal_errors
                 }
             )
-        create_cctvs = []
-        update_cctvs = []
-
-        server_names = list({row["nama_lokasi"] for row in rows})
-        ip_list = [row["ip_address"] for row in rows]
-        pos_list = [row["titik_letak"] for row in rows]
-
-        existing_locations = self.location_repository.get_existing_locations(server_names)
-
-        existing_cctvs = self.cctv_repository.get_existing_cctvs(ip_list, pos_list)
-        by_ip = existing_cctvs["ip"]
-        by_pos = existing_cctvs["position"]
-
-        new_loc_names = [name for name in server_names if name not in existing_locations]
-
-        if new_loc_names:
-            new_locs = self.location_repository.bulk_create(new_loc_names)
-            for loc in new_locs:
-                existing_locations[loc.nama_lokasi] = loc
-
-   
-        for row in rows:
-
-            location = existing_locations[row["nama_lokasi"]]
-
-            existing = by_ip.get(row["ip_address"]) or by_pos.get(row["titik_letak"])
-
-            cctv_data = {
-                "titik_letak": row["titik_letak"],
-                "ip_address": row["ip_address"],
-                "id_location": location.id_location,
-            }
-
-            if existing:
-               
-                needs_update = (
-                    existing.titik_letak != row["titik_letak"]
-                    or existing.ip_address != row["ip_address"]
-                    or existing.id_location != location.id_location
-                )
-
-                if needs_update:
-                    update_cctvs.append((existing.id_cctv, cctv_data))
-
-            else:
-                if row["titik_letak"] in by_pos or row["ip_address"] in by_ip:
-                    existing = by_pos.get(row["titik_letak"]) or by_ip.get(row["ip_address"])
-                    update_cctvs.append((existing.id_cctv, cctv_data))
-                    continue
-
-                cctv_data["stream_key"] = (
-                    f"loc_{location.id_location}_cam_{uuid.uuid4().hex[:8]}"
-                )
-                create_cctvs.append(cctv_data)
-
-        imported = (
-            self.cctv_repository.bulk_create(create_cctvs)
-            if create_cctvs else []
-        )
-
-        updated = (
-            self.cctv_repository.bulk_update(update_cctvs)
-            if update_cctvs else []
-        )
-
-        return {
-            "imported_cctvs": imported,
-            "updated_cctvs": updated,
-        }
+        records = [
+            {**row, "camera_type": self.camera_type_for(row["titik_letak"])}
+            for row in rows
+        ]
+        result = self.cctv_repository.upsert_import(records) if records else {"imported": 0, "updated": 0}
+        if result.get("conflicts"):
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": "Data tidak valid: Beberapa baris cocok dengan cctv yang sama.",
+                    "errors": [
+                        import_conflict_error(row, first_row)
+                        for row, first_row in result["conflicts"]
+                    ]
+                }
+            )
+        if commit:
+            self.cctv_repository.db.commit()
+        return result
 
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import re
+import socket
+import time
+import uuid
+from ipaddress import IPv4Address, IPv4Network
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
+from xml.etree import ElementTree
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from repositories.cctv_repository import CctvRepository
+
+logger = logging.getLogger(__name__)
+
+WS_DISCOVERY_ADDR = ("239.255.255.250", 3702)
+WS_DISCOVERY_PROBE = """<?xml version="1.0" encoding="UTF-8"?>
+<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope"
+            xmlns:w="http://schemas.xmlsoap.org/ws/2004/08/addressing"
+            xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery"
+            xmlns:dn="http://www.onvif.org/ver10/network/wsdl">
+  <e:Header>
+    <w:MessageID>uuid:{message_id}</w:MessageID>
+    <w:To e:mustUnderstand="true">urn:schemas-xmlsoap-org:ws:2005:04:discovery</w:To>
+    <w:Action e:mustUnderstand="true">http://schemas.xmlsoap.org/ws/2005/04/discovery/Probe</w:Action>
+  </e:Header>
+  <e:Body>
+    <d:Probe><d:Types>dn:NetworkVideoTransmitter</d:Types></d:Probe>
+  </e:Body>
+</e:Envelope>"""
+ONVIF_NAME_SCOPE = re.compile(r"onvif://www\.onvif\.org/name/(\S+)")
+
+
+class _WsDiscoveryProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.responses: List[tuple[bytes, str]] = []
+
+    def datagram_received(self, data, addr):
+        self.responses.append((data, addr[0]))
+
+
+class DiscoveryService:
+    def __init__(self, cctv_repository: CctvRepository, concurrency: Optional[int] = None):
+        self.cctv_repository = cctv_repository
+        self.concurrency = concurrency or settings.DISCOVERY_CONCURRENCY
+
+    @staticmethod
+    def expand_hosts(cidrs: List[str]) -> tuple[List[IPv4Network], List[str]]:
+        networks = [IPv4Network(cidr, strict=False) for cidr in cidrs]
+        hosts = []
+        seen = set()
+        for network in networks:
+            # /31 dan /32 tidak punya alamat network/broadcast
+            addresses = network.hosts() if network.prefixlen < 31 else iter(network)
+            for address in addresses:
+                ip = str(address)
+                if ip not in seen:
+                    seen.add(ip)
+                    hosts.append(ip)
+                if len(hosts) > settings.DISCOVERY_MAX_HOSTS:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Maksimum {settings.DISCOVERY_MAX_HOSTS} host per pemindaian"
+                    )
+        return networks, hosts
+
+    @staticmethod
+    async def probe_port(ip: str, port: int, timeout: float) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def scan(self, hosts: List[str], ports: List[int], timeout: float) -> Dict[str, List[int]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe_host(ip: str):
+            async with semaphore:
+                results = await asyncio.gather(*(self.probe_port(ip, port, timeout) for port in ports))
+            return ip, [port for port, is_open in zip(ports, results) if is_open]
+
+        results = await asyncio.gather(*(probe_host(ip) for ip in hosts))
+        return {ip: open_ports for ip, open_ports in results if open_ports}
+
+    @staticmethod
+    def _parse_probe_match(data: bytes, sender_ip: str) -> Optional[dict]:
+        try:
+            root = ElementTree.fromstring(data)
+        except ElementTree.ParseError:
+            return None
+
+        values = {}
+        for element in root.iter():
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag in ("XAddrs", "Scopes", "Address") and element.text:
+                values[tag] = element.text.strip()
+
+        ip = sender_ip
+        xaddrs = values.get("XAddrs", "").split()
+        if xaddrs:
+            host = urlparse(xaddrs[0]).hostname
+            if host:
+                ip = host
+
+        name_match = ONVIF_NAME_SCOPE.search(values.get("Scopes", ""))
+        return {
+            "ip": ip,
+            "name": unquote(name_match.group(1)) if name_match else None,
+            "endpoint": values.get("Address"),
+            "xaddrs": xaddrs,
+        }
+
+    async def ws_discovery(self, timeout: float) -> Dict[str, dict]:
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            _WsDiscoveryProtocol,
+            family=socket.AF_INET,
+            local_addr=("0.0.0.0", 0),
+        )
+        try:
+            sock = transport.get_extra_info("socket")
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+            probe = WS_DISCOVERY_PROBE.format(message_id=uuid.uuid4()).encode()
+            transport.sendto(probe, WS_DISCOVERY_ADDR)
+            await asyncio.sleep(timeout)
+        finally:
+            transport.close()
+
+        devices = {}
+        for data, sender_ip in protocol.responses:
+            device = self._parse_probe_match(data, sender_ip)
+            if device:
+                devices[device["ip"]] = device
+        return devices
+
+    @staticmethod
+    def _in_networks(ip: str, networks: List[IPv4Network]) -> bool:
+        try:
+            address = IPv4Address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in networks)
+
+    async def discover(self, cidrs: List[str], ports: List[int], onvif: bool = False, timeout: float = 1.0) -> dict:
+        started = time.monotonic()
+        networks, hosts = self.expand_hosts(cidrs)
+
+        scan_task = self.scan(hosts, ports, timeout)
+        if onvif:
+            open_ports, onvif_devices = await asyncio.gather(scan_task, self.ws_discovery(timeout))
+            onvif_devices = {
+                ip: device for ip, device in onvif_devices.items()
+                if self._in_networks(ip, networks)
+            }
+        else:
+            open_ports, onvif_devices = await scan_task, {}
+
+        responding = set(open_ports) | set(onvif_devices)
+        onvif_names = [d["name"] for d in onvif_devices.values() if d["name"]]
+
+        existing = await asyncio.to_thread(
+            self.cctv_repository.get_existing_in_subnets,
+            [str(network) for network in networks],
+            onvif_names
+        )
+        by_ip = existing["ip"]
+        by_pos = existing["position"]
+        host_set = set(hosts)
+
+        moved = []
+        moved_ips = set()
+        moved_ids = set()
+        for ip, device in onvif_devices.items():
+            cam = by_pos.get(device["name"]) if device["name"] else None
+            if cam and cam.ip_address != ip and cam.ip_address not in responding:
+                moved.append({
+                    "id_cctv": cam.id_cctv,
+                    "titik_letak": cam.titik_letak,
+                    "old_ip": cam.ip_address,
+                    "new_ip": ip,
+                })
+                moved_ips.add(ip)
+                moved_ids.add(cam.id_cctv)
+
+        new = [
+            {
+                "ip_address": ip,
+                "open_ports": open_ports.get(ip, []),
+                "onvif_name": onvif_devices.get(ip, {}).get("name"),
+            }
+            for ip in sorted(responding - moved_ips, key=IPv4Address)
+            if ip not in by_ip
+        ]
+        missing = [
+            {
+                "id_cctv": cam.id_cctv,
+                "titik_letak": cam.titik_letak,
+                "ip_address": cam.ip_address,
+            }
+            for ip, cam in sorted(
+                ((ip, cam) for ip, cam in by_ip.items() if ip in host_set),
+                key=lambda item: IPv4Address(item[0])
+            )
+            if ip not in responding and cam.id_cctv not in moved_ids
+        ]
+
+        duration = round(time.monotonic() - started, 2)
+        logger.info(
+            f"Discovery {cidrs}: {len(hosts)} host dalam {duration}s, "
+            f"baru={len(new)} hilang={len(missing)} pindah={len(moved)}"
+        )
+        return {
+            "scanned_hosts": len(hosts),
+            "responding": len(responding),
+            "known": len(responding & set(by_ip)),
+            "duration_seconds": duration,
+            "new": new,
+            "missing": missing,
+            "moved": moved,
+        }
@@ -0,0 +1,199 @@
+import csv
+import io
+import json
+import tempfile
+import zlib
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+import xlsxwriter
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# format mesin: csv/ndjson di-stream baris demi baris, parquet dibangun per batch
+STREAM_FORMATS = {
+    "csv": ".csv.gz",
+    "ndjson": ".ndjson.gz",
+}
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+PARQUET_BATCH_SIZE = 10000
+EXPORT_FORMAT_PATTERN = "^(xlsx|csv|ndjson|parquet)$"
+# file export di bawah ukuran ini tetap di memori, di atasnya pindah ke disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class ExportColumn(NamedTuple):
+    key: str
+    header: str
+    format: Optional[Callable[[Any], Any]] = None
+
+
+def export_value(row, column: ExportColumn):
+    value = getattr(row, column.key)
+    if column.format is not None:
+        value = column.format(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(ZoneInfo(settings.TIMEZONE)).replace(tzinfo=None)
+    return value
+
+
+def write_xlsx(
+    rows: Iterable,
+    columns: list[ExportColumn],
+    sheet_name: str = "Sheet1",
+    metadata: list[list] = ()
+):
+    """Tulis rows ke workbook xlsx baris demi baris.
+
+    Mode constant_memory hanya menyimpan satu baris di memori, dan hasilnya
+    ditulis ke SpooledTemporaryFile. rows bisa berupa iterator yield_per
+    sehingga data tidak pernah dimuat seluruhnya.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    workbook = xlsxwriter.Workbook(output, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({"bold": True, "border": 1})
+
+    row_index = 0
+    for metadata_row in metadata:
+        worksheet.write_row(row_index, 0, metadata_row)
+        row_index += 1
+
+    worksheet.write_row(row_index, 0, [column.header for column in columns], header_format)
+    row_index += 1
+
+    for row in rows:
+        worksheet.write_row(row_index, 0, [export_value(row, column) for column in columns])
+        row_index += 1
+
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def iter_file(fileobj, chunk_size: int = CHUNK_SIZE):
+    try:
+        while chunk := fileobj.read(chunk_size):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def iter_rows(bind, fetch: Callable[[Session], Iterable]):
+    """Buka session sendiri saat generator mulai dibaca.
+
+    Response streaming dikirim setelah session dari dependency ditutup,
+    jadi cursor dibuka di sini pada engine yang sama (primary/replica).
+    """
+    db = Session(bind=bind)
+    try:
+        yield from fetch(db)
+    finally:
+        db.close()
+
+
+def _gzip(chunks: Iterable[str]):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _csv_lines(rows: Iterable, columns: list[ExportColumn]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.header for column in columns])
+    for row in rows:
+        writer.writerow([export_value(row, column) for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson_lines(rows: Iterable, columns: list[ExportColumn]):
+    for row in rows:
+        record = {column.header: export_value(row, column) for column in columns}
+        yield json.dumps(record, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def export_filename(stem: str, export_format: str) -> str:
+    if export_format in STREAM_FORMATS:
+        return f"{stem}{STREAM_FORMATS[export_format]}"
+    if export_format == "parquet":
+        return f"{stem}.parquet"
+    return f"{stem}.xlsx"
+
+
+def stream_export(export_format: str, rows: Iterable, columns: list[ExportColumn], filename: str) -> dict:
+    lines = _csv_lines(rows, columns) if export_format == "csv" else _ndjson_lines(rows, columns)
+    return {
+        "data": _gzip(lines),
+        "filename": export_filename(filename, export_format),
+        "media_type": "application/gzip",
+    }
+
+
+def parquet_export(rows: Iterable, columns: list[ExportColumn], filename: str) -> dict:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format parquet membutuhkan paket pyarrow di server"
+        )
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    headers = [column.header for column in columns]
+    writer = None
+    batch = {header: [] for header in headers}
+    batch_rows = 0
+
+    def flush():
+        nonlocal writer, batch, batch_rows
+        if writer is None:
+            table = pa.Table.from_pydict(batch)
+            # kolom yang seluruhnya kosong di batch pertama disimpan sebagai string
+            schema = pa.schema([
+                pa.field(field.name, pa.string() if pa.types.is_null(field.type) else field.type)
+                for field in table.schema
+            ])
+            writer = pq.ParquetWriter(output, schema)
+        writer.write_table(pa.Table.from_pydict(batch, schema=writer.schema))
+        batch = {header: [] for header in headers}
+        batch_rows = 0
+
+    for row in rows:
+        for column in columns:
+            batch[column.header].append(export_value(row, column))
+        batch_rows += 1
+        if batch_rows >= PARQUET_BATCH_SIZE:
+            flush()
+    if batch_rows or writer is None:
+        flush()
+
+    writer.close()
+    output.seek(0)
+    return {
+        "data": iter_file(output),
+        "filename": export_filename(filename, "parquet"),
+        "media_type": PARQUET_MEDIA_TYPE,
+    }
@@ -0,0 +1,110 @@
+import gzip
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from core.config import settings
+from repositories.history_repository import HistoryRepository
+from services.notification_retention import NotificationRetentionService
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^history_(\d{4})_(\d{2})$")
+
+
+def _month_start(year: int, month: int) -> datetime:
+    # batas partisi mengikuti awal bulan di zona waktu aplikasi
+    return datetime(year, month, 1, tzinfo=ZoneInfo(settings.TIMEZONE))
+
+
+def _add_months(year: int, month: int, months: int) -> tuple[int, int]:
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+class HistoryPartitionService:
+    """Membuat partisi bulanan history di depan dan mengarsipkan yang lama.
+
+    Partisi yang melewati HISTORY_RETENTION_MONTHS ditulis ke file CSV gzip
+    di HISTORY_ARCHIVE_DIR, lalu di-detach dan di-drop, sehingga menghapus
+    data lama cukup berupa operasi metadata. Notifikasi yang menunjuk ke
+    partisi itu dihapus lebih dulu per batch lewat notification_retention.
+    """
+
+    def __init__(
+        self,
+        history_repo: HistoryRepository,
+        notification_retention: Optional[NotificationRetentionService] = None,
+        months_ahead: int = settings.HISTORY_PARTITION_MONTHS_AHEAD,
+        retention_months: int = settings.HISTORY_RETENTION_MONTHS,
+        archive_dir: str = settings.HISTORY_ARCHIVE_DIR
+    ):
+        self.history_repo = history_repo
+        self.notification_retention = notification_retention
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.archive_dir = archive_dir
+
+    def ensure_partitions(self) -> list[str]:
+        now = datetime.now(ZoneInfo(settings.TIMEZONE))
+        existing = set(self.history_repo.list_partitions())
+        created = []
+        for offset in range(self.months_ahead + 1):
+            year, month = _add_months(now.year, now.month, offset)
+            name = f"history_{year:04d}_{month:02d}"
+            if name in existing:
+                continue
+            next_year, next_month = _add_months(year, month, 1)
+            self.history_repo.create_partition(
+                name,
+                _month_start(year, month),
+                _month_start(next_year, next_month)
+            )
+            created.append(name)
+
+        if created:
+            logger.info(f"Partisi history dibuat: {', '.join(created)}")
+        return created
+
+    def archive_expired(self) -> list[str]:
+        # tanpa retensi notifikasi, partisi tidak bisa di-drop dengan bersih
+        if self.retention_months <= 0 or self.notification_retention is None:
+            return []
+
+        now = datetime.now(ZoneInfo(settings.TIMEZONE))
+        oldest_year, oldest_month = _add_months(now.year, now.month, -self.retention_months)
+        archived = []
+
+        for name in self.history_repo.list_partitions():
+            match = PARTITION_NAME.match(name)
+            if not match:
+                continue
+            year, month = int(match.group(1)), int(match.group(2))
+            if (year, month) >= (oldest_year, oldest_month):
+                continue
+
+            os.makedirs(self.archive_dir, exist_ok=True)
+            path = os.path.join(self.archive_dir, f"{name}.csv.gz")
+            partial_path = f"{path}.partial"
+            with gzip.open(partial_path, "wb") as archive:
+                self.history_repo.copy_partition(name, archive)
+            os.replace(partial_path, path)
+
+            next_year, next_month = _add_months(year, month, 1)
+            self.notification_retention.prune_range(
+                _month_start(year, month), _month_start(next_year, next_month)
+            )
+            self.history_repo.drop_partition(name)
+            archived.append(name)
+            logger.info(f"Partisi {name} diarsipkan ke {path}")
+
+        return archived
+
+    def maintain(self) -> dict:
+        return {
+            "created": self.ensure_partitions(),
+            "archived": self.archive_expired(),
+        }
@@ -1,13 +1,26 @@
 from repositories.history_repository import HistoryRepository
 from repositories.cctv_repository import CctvRepository
 from repositories.user_repository import UserRepository
+from repositories.data_version_repository import DataVersionRepository
 from fastapi import HTTPException, status
 from datetime import date, datetime
-from io import BytesIO
 # from xlsxwriter import Workbook
-import pandas as pd
 import pytz
 from schemas.history_schemas import HistoryCreate, HistoryUpdate
+from services.export_writer import (
+    ExportColumn, STREAM_FORMATS, XLSX_MEDIA_TYPE,
+    export_filename, iter_file, iter_rows, parquet_export, stream_export, write_xlsx
+)
+
+HISTORY_EXPORT_COLUMNS = [
+    ExportColumn("titik_letak", "Titik Letak"),
+    ExportColumn("ip_address", "Ip Address"),
+    ExportColumn("nama_lokasi", "Lokasi Dvr"),
+    ExportColumn("note", "Catatan"),
+    ExportColumn("service", "Status Perbaikan", {True: "Sudah diperbaiki", False: "Belum diperbaiki"}.get),
+    ExportColumn("status", "Status Cctv", {True: "Online", False: "Offline"}.get),
+    ExportColumn("created_at", "Tanggal dan Waktu"),
+]
 
 class HistoryService:
     def __init__(
@@ -20,8 +33,11 @@ class HistoryService:
         self.cctv_repo = cctv_repo
         self.user_repo = user_repo
 
-    def get_all_hisotries(self, skip: int = 0, limit: int = 1000):
-        return self.history_repo.get_all(skip, limit)
+    def get_all_hisotries(self, before_id: int = None, after_id: int = None, limit: int = 1000, skip: int = 0):
+        return self.history_repo.get_all(before_id, after_id, limit, skip)
+
+    def estimate_total(self) -> int:
+        return self.history_repo.estimate_total()
         
     def create_history(self, history: HistoryCreate):
         existing_cctv = self.cctv_repo.get_by_id(history.id_cctv)
@@ -47,50 +63,57 @@ class HistoryService:
         db_history.cctv_name = db_cctv.titik_letak
         return db_history
         
-    def export_history(self, start_date: date, end_date: date, nama_user: str):
-        wib_tz = pytz.timezone('Asia/Jakarta')
-        data = self.history_repo.get_all_fox_export(start_date, end_date)
-        df = pd.DataFrame([dict(row._mapping) for row in data])
-        if 'created_at' in df.columns:
-                    df['created_at'] = df['created_at'].dt.tz_localize(None)
-        if 'service' in df.columns:
-                    df['service'] = df['service'].map({True: 'Sudah diperbaiki', False: 'Belum diperbaiki'})
-        if 'status' in df.columns:
-                    df['status'] = df['status'].map({True: 'Online', False: 'Offline'})
-        df.rename(columns={
-            "titik_letak": "Titik Letak",
-            "ip_address": "Ip Address",
-            "nama_lokasi": "Lokasi Dvr",
-            "status": "Status Cctv",
-            "service": "Status Perbaikan",
-            "note": "Catatan",
-            "created_at": "Tanggal dan Waktu",
-        }, inplace=True)
-        current_wib_time = datetime.now(wib_tz)
+    def export_version(self) -> dict:
+        return DataVersionRepository(self.history_repo.db).get_versions(["history", "cctv_camera", "location"])
+
+    @staticmethod
+    def export_filename(start_date: date, end_date: date, export_format: str = "xlsx") -> str:
+        return export_filename(f"Laporan_kerusakan_dari_{start_date}_sampai_{end_date}", export_format)
+
+    def export_history(
+        self,
+        start_date: date,
+        end_date: date,
+        nama_user: str,
+        export_format: str = "xlsx",
+        include_export_time: bool = True
+    ):
+        """Export history; include_export_time=False untuk file yang di-cache
+        dan dikirim ulang, agar tidak memuat waktu ekspor yang sudah lewat."""
+        filename = f"Laporan_kerusakan_dari_{start_date}_sampai_{end_date}"
+        if export_format in STREAM_FORMATS:
+            rows = iter_rows(
+                self.history_repo.db.get_bind(),
+                lambda db: HistoryRepository(db).iter_fox_export(start_date, end_date)
+            )
+            return stream_export(export_format, rows, HISTORY_EXPORT_COLUMNS, filename)
+        if export_format == "parquet":
+            return parquet_export(
+                self.history_repo.iter_fox_export(start_date, end_date),
+                HISTORY_EXPORT_COLUMNS,
+                filename
+            )
+
         metadata = [
             ["Laporan Kerusakan CCTV"],
             [f"Periode: {start_date} sampai {end_date}"],
             [f"Dibuat oleh: {nama_user}"],
-            [f"Tanggal Ekspor: {current_wib_time.strftime('%Y-%m-%d %H:%M:%S')}"],
-            ["", ""]
         ]
+        if include_export_time:
+            wib_tz = pytz.timezone('Asia/Jakarta')
+            current_wib_time = datetime.now(wib_tz)
+            metadata.append([f"Tanggal Ekspor: {current_wib_time.strftime('%Y-%m-%d %H:%M:%S')}"])
+        metadata.append(["", ""])
 
-        df_metadata = pd.DataFrame(metadata, columns=["Keterangan", "Nilai"])
-        # unique_time = datetime.now().strftime("%Y%m%d%H%M%S") 
-            
-        output = BytesIO() 
-        
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            sheet_name = "Laporan Kerusakan CCTV"
-            df_metadata.to_excel(writer, sheet_name=sheet_name, index=False, startrow=0, header=False)
-        # df.to_excel(output, index=False)
-            start_row = len(metadata) 
-
-            df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=start_row)
-        output.seek(0)
+        output = write_xlsx(
+            self.history_repo.iter_fox_export(start_date, end_date),
+            HISTORY_EXPORT_COLUMNS,
+            sheet_name="Laporan Kerusakan CCTV",
+            metadata=metadata
+        )
 
         return {
-            "data": output, 
-            "filename": f"Laporan_kerusakan_dari_{start_date}_sampai_{end_date}.xlsx",
-            "media_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            "data": iter_file(output), 
+            "filename": export_filename(filename, export_format),
+            "media_type": XLSX_MEDIA_TYPE
         }
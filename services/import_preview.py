@@ -0,0 +1,87 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+
+
+def chunked(rows: list[dict], size: int = None) -> Iterator[list[dict]]:
+    size = size or settings.IMPORT_CHUNK_SIZE
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def new_diff() -> dict:
+    return {"creates": [], "updates": [], "unchanged": 0, "errors": [], "total_creates": 0, "total_updates": 0}
+
+
+def add_to_diff(diff: dict, key: str, item: dict):
+    # daftar rincian dibatasi, total tetap dihitung penuh
+    diff[f"total_{key}"] += 1
+    if len(diff[key]) < settings.IMPORT_PREVIEW_MAX_ITEMS:
+        diff[key].append(item)
+
+
+def field_changes(current: dict, new: dict) -> dict:
+    return {
+        field: {"lama": current[field], "baru": value}
+        for field, value in new.items()
+        if current[field] != value
+    }
+
+
+class ImportPreviewCache:
+    """Simpan baris import yang sudah divalidasi saat dry-run.
+
+    Token dikembalikan ke client dan dipakai sekali di endpoint apply,
+    sehingga file tidak perlu di-upload dan di-parse ulang. Jumlah entri
+    dibatasi (entri terlama dibuang) dan setiap entri kedaluwarsa setelah ttl.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        while self._entries:
+            token, entry = next(iter(self._entries.items()))
+            if entry["expires"] > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[token]
+
+    def put(self, import_type: str, id_user: int, rows: list[dict]) -> str:
+        token = secrets.token_urlsafe(24)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[token] = {
+                "type": import_type,
+                "id_user": id_user,
+                "rows": rows,
+                "expires": now + self.ttl,
+            }
+            self._purge(now)
+        return token
+
+    def pop(self, token: str, import_type: str, id_user: int) -> list[dict]:
+        with self._lock:
+            self._purge(time.monotonic())
+            entry = self._entries.get(token)
+            if not entry or entry["type"] != import_type or entry["id_user"] != id_user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Token import tidak ditemukan atau sudah kedaluwarsa"
+                )
+            del self._entries[token]
+        return entry["rows"]
+
+
+import_preview_cache = ImportPreviewCache(
+    max_entries=settings.IMPORT_PREVIEW_MAX_ENTRIES,
+    ttl=settings.IMPORT_PREVIEW_TTL,
+)
@@ -0,0 +1,94 @@
+import csv
+import io
+import os
+from typing import Iterator
+
+from fastapi import HTTPException, UploadFile
+
+from core.config import settings
+from core.upload_limit import upload_too_large
+
+
+def check_upload_size(uploaded_file: UploadFile, max_bytes: int = None):
+    # upload besar sudah ditolak UploadSizeLimitMiddleware; ini cek ukuran file
+    # sebenarnya, tanpa overhead multipart
+    max_bytes = max_bytes or settings.IMPORT_MAX_UPLOAD_BYTES
+    file = uploaded_file.file
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    if size > max_bytes:
+        raise upload_too_large(max_bytes)
+
+
+def _cell(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return None if value is None else str(value)
+
+
+def _iter_csv(file) -> Iterator[tuple]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        # jangan ikut menutup file upload milik starlette
+        text.detach()
+
+
+def _iter_xlsx(file) -> Iterator[tuple]:
+    from openpyxl import load_workbook
+
+    # read_only membaca sheet secara streaming, bukan memuat seluruh workbook
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_import_chunks(
+    uploaded_file: UploadFile,
+    required_columns: list[str],
+    chunk_size: int = None
+) -> Iterator[list[dict]]:
+    """Baca file import (xlsx atau csv) per chunk berisi chunk_size baris.
+
+    Setiap baris berupa dict dengan key nama kolom header (di-strip dan
+    di-lowercase) ditambah "_row", nomor baris di file untuk pesan error.
+    Baris yang seluruhnya kosong dilewati.
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    check_upload_size(uploaded_file)
+
+    filename = (uploaded_file.filename or "").lower()
+    rows = _iter_csv(uploaded_file.file) if filename.endswith(".csv") else _iter_xlsx(uploaded_file.file)
+
+    header = next(rows, None)
+    if header is None:
+        raise HTTPException(status_code=400, detail="File import kosong")
+    columns = [str(name).strip().lower() if name is not None else "" for name in header]
+
+    missing = [name for name in required_columns if name not in columns]
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Kolom wajib tidak ada", "errors": missing}
+        )
+
+    chunk = []
+    for row_number, values in enumerate(rows, start=2):
+        record = {name: _cell(value) for name, value in zip(columns, values) if name}
+        if not any(record.values()):
+            continue
+        record["_row"] = row_number
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
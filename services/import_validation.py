@@ -0,0 +1,102 @@
+import pandas as pd
+
+# pesan error disamakan dengan pesan Pydantic pada schema import
+STRING_TYPE_MESSAGE = "Input should be a valid string"
+IPV4_PATTERN = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(?:\.(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}"
+
+
+def import_frame(chunk: list[dict], columns: list[str]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(chunk, columns=["_row", *columns])
+    return frame.astype({column: object for column in columns}).where(frame.notna(), None)
+
+
+def string_errors(
+    values: pd.Series,
+    min_length: int = None,
+    max_length: int = None,
+    pattern: str = None,
+    required: bool = True
+) -> pd.Series:
+    """Pesan error pertama per baris untuk satu kolom string, None jika valid."""
+    missing = values.isna()
+    text = values.astype("string")
+    lengths = text.str.len()
+    errors = pd.Series(None, index=values.index, dtype=object)
+
+    if required:
+        errors = errors.mask(missing, STRING_TYPE_MESSAGE)
+    checks = []
+    if min_length is not None:
+        checks.append((lengths < min_length, f"String should have at least {min_length} characters"))
+    if max_length is not None:
+        checks.append((lengths > max_length, f"String should have at most {max_length} characters"))
+    if pattern is not None:
+        checks.append((~text.str.fullmatch(pattern), f"String should match pattern '{pattern}'"))
+
+    for failed, message in checks:
+        errors = errors.mask(errors.isna() & ~missing & failed.fillna(False).astype(bool), message)
+    return errors
+
+
+def ipv4_errors(values: pd.Series, message: str) -> pd.Series:
+    text = values.astype("string")
+    invalid = values.notna() & ~text.str.fullmatch(IPV4_PATTERN).fillna(False).astype(bool)
+    return pd.Series(None, index=values.index, dtype=object).mask(invalid, message)
+
+
+def missing_errors(values: pd.Series, message: str) -> pd.Series:
+    return pd.Series(None, index=values.index, dtype=object).mask(values.isna(), message)
+
+
+def first_error(*columns: pd.Series) -> pd.Series:
+    """Gabungkan error per kolom sesuai urutan field, ambil yang pertama."""
+    errors = columns[0]
+    for column in columns[1:]:
+        errors = errors.where(errors.notna(), column)
+    return errors
+
+
+def field_errors_for(name: str, errors: pd.Series) -> pd.Series:
+    """Awali pesan dengan nama field, seperti lokasi error Pydantic."""
+    return (f"{name}: " + errors.dropna()).reindex(errors.index)
+
+
+def duplicate_errors(
+    frame: pd.DataFrame,
+    valid: pd.Series,
+    column: str,
+    label: str,
+    seen: dict
+) -> pd.Series:
+    """Tandai nilai yang sudah muncul di baris sebelumnya dalam file.
+
+    seen menyimpan nilai -> nomor baris pertama dari chunk sebelumnya dan
+    diperbarui dengan nilai baru dari chunk ini.
+    """
+    values = frame.loc[valid, column]
+    rows = frame.loc[valid, "_row"]
+    first_in_chunk = rows.groupby(values, sort=False).transform("first")
+    first_row = values.map(seen).fillna(first_in_chunk).astype(int)
+
+    seen.update(
+        (value, row)
+        for value, row in zip(values[first_row == rows], rows[first_row == rows])
+        if value is not None
+    )
+
+    duplicate = (first_row != rows) & values.notna()
+    messages = (
+        f"Duplikasi {label} : " + values[duplicate].astype(str)
+        + " sudah ada di baris " + first_row[duplicate].astype(str)
+    )
+    return messages.reindex(frame.index)
+
+
+def collect_errors(frame: pd.DataFrame, *columns: pd.Series) -> list[str]:
+    """Susun pesan "Baris N: ..." urut nomor baris."""
+    errors = []
+    for messages in columns:
+        messages = messages.dropna()
+        errors.extend(zip(frame.loc[messages.index, "_row"], messages))
+    errors.sort(key=lambda error: error[0])
+    return [f"Baris {row}: {message}" for row, message in errors]
@@ -0,0 +1,224 @@
+import logging
+import os
+import shutil
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from database import SessionLocal
+from models.job_model import JobStatus
+from repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+# fungsi job menerima session sendiri dan callback progress, lalu
+# mengembalikan ringkasan (dict), dict export {"data", "filename",
+# "media_type"} atau file jadi {"path", "filename", "media_type"}
+JobFunc = Callable[[Session, Callable[[dict], None]], Any]
+
+
+def _utc_now() -> datetime:
+    return datetime.now(ZoneInfo("UTC"))
+
+
+class JobRunner:
+    """Antrean job berat (import, export, dump database) di luar request HTTP.
+
+    Job dijalankan oleh ThreadPoolExecutor dengan jumlah worker terbatas,
+    sehingga hanya sedikit koneksi database yang dipakai untuk pekerjaan
+    berat. Jika antrean penuh, submit ditolak dengan 429. Status disimpan
+    di tabel job, file hasil di result_dir sampai expires_at.
+
+    Setiap job dicatat dengan owner (id proses ini) dan heartbeat. Job yang
+    heartbeat-nya berhenti lebih dari stale_after detik berarti prosesnya
+    sudah mati, dan ditandai gagal oleh proses mana pun yang masih hidup.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        result_dir: str,
+        max_workers: int,
+        max_pending: int,
+        result_ttl: int,
+        stale_after: int
+    ):
+        self.session_factory = session_factory
+        self.result_dir = result_dir
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        self.instance_id: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        os.makedirs(self.result_dir, exist_ok=True)
+        # dibuat saat start, bukan saat import, agar tiap worker punya id sendiri
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        with self.session_factory() as db:
+            self._fail_stale(JobRepository(db))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            # job antrean dibatalkan; job yang sedang berjalan tetap diselesaikan
+            try:
+                with self.session_factory() as db:
+                    JobRepository(db).fail_owned(
+                        self.instance_id, [JobStatus.queued], "Job dibatalkan karena server berhenti"
+                    )
+            except Exception:
+                logger.error("Status job antrean gagal disimpan saat shutdown", exc_info=True)
+
+    def heartbeat(self, job_repository: JobRepository) -> dict:
+        """Perbarui heartbeat job milik proses ini dan gagalkan job yang stale."""
+        touched = job_repository.touch(self.instance_id)
+        return {"touched": touched, "failed": self._fail_stale(job_repository)}
+
+    def _fail_stale(self, job_repository: JobRepository) -> int:
+        # job milik proses yang mati tidak bisa dilanjutkan
+        stale_before = _utc_now() - timedelta(seconds=self.stale_after)
+        count = job_repository.fail_stale(self.instance_id, stale_before, "Job terhenti karena server restart")
+        if count:
+            logger.warning(f"{count} job dari proses yang sudah berhenti ditandai gagal")
+        return count
+
+    def _expires_at(self) -> datetime:
+        return _utc_now() + timedelta(seconds=self.result_ttl)
+
+    def save_upload(self, uploaded_file: UploadFile) -> str:
+        """Salin file upload ke disk; file upload ditutup setelah request selesai."""
+        os.makedirs(self.result_dir, exist_ok=True)
+        _, ext = os.path.splitext(uploaded_file.filename or "")
+        path = os.path.join(self.result_dir, f"upload_{uuid.uuid4().hex}{ext.lower()}")
+        with open(path, "wb") as f:
+            shutil.copyfileobj(uploaded_file.file, f)
+        return path
+
+    def submit(self, job_type: str, params: dict, id_user: int, func: JobFunc, cleanup_path: str = None):
+        if self._executor is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job runner belum berjalan"
+            )
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Antrean job penuh, coba lagi nanti",
+                    headers={"Retry-After": "30"}
+                )
+            self._pending += 1
+
+        try:
+            with self.session_factory() as db:
+                job = JobRepository(db).create(
+                    uuid.uuid4().hex, job_type, params, id_user, self._expires_at(), self.instance_id
+                )
+                db.expunge(job)
+            self._executor.submit(self._run, job.id_job, func, cleanup_path)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def _update(self, id_job: str, **fields) -> bool:
+        with self.session_factory() as db:
+            return JobRepository(db).update(id_job, self.instance_id, **fields)
+
+    def _run(self, id_job: str, func: JobFunc, cleanup_path: str = None):
+        try:
+            if not self._update(id_job, status=JobStatus.running, started_at=_utc_now()):
+                logger.warning(f"Job {id_job} sudah ditandai gagal, tidak dijalankan")
+                return
+            with self.session_factory() as db:
+                output = func(db, lambda progress: self._update(id_job, progress=progress))
+            fields = self._store(id_job, output)
+            updated = self._update(
+                id_job,
+                status=JobStatus.succeeded,
+                finished_at=_utc_now(),
+                expires_at=self._expires_at(),
+                **fields
+            )
+            if not updated:
+                logger.warning(f"Job {id_job} sudah ditandai gagal, hasil dibuang")
+                if fields.get("result_path") and os.path.exists(fields["result_path"]):
+                    os.remove(fields["result_path"])
+                return
+            logger.info(f"Job {id_job} selesai")
+        except HTTPException as e:
+            # error validasi import berupa dict berisi daftar error per baris
+            detail = e.detail if isinstance(e.detail, dict) else {"message": e.detail}
+            self._fail(id_job, detail.get("message"), detail)
+        except Exception as e:
+            logger.error(f"Job {id_job} gagal: {e}", exc_info=True)
+            self._fail(id_job, str(e))
+        finally:
+            if cleanup_path and os.path.exists(cleanup_path):
+                os.remove(cleanup_path)
+            with self._lock:
+                self._pending -= 1
+
+    def _fail(self, id_job: str, error: str, result: dict = None):
+        try:
+            self._update(
+                id_job,
+                status=JobStatus.failed,
+                error=error,
+                result=result,
+                finished_at=_utc_now(),
+                expires_at=self._expires_at(),
+            )
+        except Exception:
+            logger.error(f"Status job {id_job} gagal disimpan", exc_info=True)
+
+    def _store(self, id_job: str, output) -> dict:
+        if not isinstance(output, dict) or ("data" not in output and "path" not in output):
+            return {"result": output}
+
+        path = os.path.join(self.result_dir, f"{id_job}.bin")
+        if "path" in output:
+            shutil.move(output["path"], path)
+        else:
+            with open(path, "wb") as f:
+                for chunk in output["data"]:
+                    f.write(chunk)
+        return {
+            "result_path": path,
+            "result_filename": output["filename"],
+            "media_type": output["media_type"],
+        }
+
+    def cleanup(self, job_repository: JobRepository) -> dict:
+        """Hapus job yang sudah kedaluwarsa beserta file hasilnya."""
+        expired = job_repository.get_expired(_utc_now())
+        for job in expired:
+            if job.result_path and os.path.exists(job.result_path):
+                os.remove(job.result_path)
+        deleted = job_repository.delete_by_ids([job.id_job for job in expired]) if expired else 0
+        return {"deleted": deleted}
+
+
+job_runner = JobRunner(
+    SessionLocal,
+    settings.JOB_RESULT_DIR,
+    max_workers=settings.JOB_WORKERS,
+    max_pending=settings.JOB_MAX_PENDING,
+    result_ttl=settings.JOB_RESULT_TTL,
+    stale_after=settings.JOB_STALE_AFTER,
+)
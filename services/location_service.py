@@ -5,8 +5,11 @@ class LocationService:
     def __init__(self, location_repository: LocationRepository):
         self.location_repository = location_repository
 
-    def get_all_location(self, skip: int = 0, limit: int = 50 ):
-        return self.location_repository.get_all(skip, limit)
+    def get_all_location(self, before_id: int = None, after_id: int = None, limit: int = 50, skip: int = 0):
+        return self.location_repository.get_all(before_id, after_id, limit, skip)
+
+    def estimate_total(self) -> int:
+        return self.location_repository.estimate_total()
     
     def create_location(self, location: LocationCreate):
         exiting_name = self.location_repository.get_by_name(location.nama_lokasi)
@@ -10,11 +10,11 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 import httpx
-from repositories.cctv_repository import CctvRepository
-from repositories.location_repository import LocationRepository
-from repositories.history_repository import HistoryRepository
+from repositories.cctv_repository import AsyncCctvRepository
+from repositories.location_repository import AsyncLocationRepository
+from repositories.history_repository import AsyncHistoryRepository
 from core.config import settings
-from services.notification_service import NotificationService
+from services.notification_service import AsyncNotificationService
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +40,7 @@ class MediaMTXService:
     PING_RETRY_WITHIN_CHECK = 2   
     PING_RETRY_DELAY = 3           
     _offline_counters: Dict[str, int] = {}
-    def __init__(self, cctv_repository: CctvRepository, history_repository: HistoryRepository, notification_service: NotificationService):
+    def __init__(self, cctv_repository: AsyncCctvRepository, history_repository: AsyncHistoryRepository, notification_service: AsyncNotificationService):
         self.rtsp_port = 8554
         self.http_port = 8888
         self.cctv_repository = cctv_repository
@@ -217,7 +217,7 @@ class MediaMTXService:
             logger.warning("MediaMTX API tidak dapat diakses. Skip pemeriksaan status.")
             return {}
             
-        cctvs = self.cctv_repository.get_all_stream()
+        cctvs = await self.cctv_repository.get_all_stream()
         status_map = {}
         status_counts = {
             StreamStatus.ACTIVE: 0,
@@ -259,20 +259,15 @@ class MediaMTXService:
                     logger.info(f"✓ Reset offline counter untuk {cam.ip_address} (ACTIVE, sebelumnya: {prev_count})")
                 
                 # Update history jika sebelumnya offline
-                latest_history = await asyncio.to_thread(
-                    self.history_repository.get_latest_by_cctv, 
-                    cam.id_cctv
-                )
+                latest_history = await self.history_repository.get_latest_by_cctv(cam.id_cctv)
                 
                 if latest_history and latest_history.service is False:
                     try:
-                        await asyncio.to_thread(
-                            self.history_repository.update_service_status,
+                        await self.history_repository.update_service_status(
                             latest_history.id_history,
                             True
                         )
-                        await asyncio.to_thread(
-                            self.cctv_repository.update_streaming_status,
+                        await self.cctv_repository.update_streaming_status(
                             cam.id_cctv,
                             True
                         )
@@ -294,8 +289,7 @@ class MediaMTXService:
                     status = StreamStatus.OFFLINE
                     
                     # Update database
-                    await asyncio.to_thread(
-                        self.cctv_repository.update_streaming_status,
+                    await self.cctv_repository.update_streaming_status(
                         cam.id_cctv, 
                         False
                     )
@@ -325,8 +319,7 @@ class MediaMTXService:
                     )
                 
                 # Update streaming status jika masih reachable
-                await asyncio.to_thread(
-                    self.cctv_repository.update_streaming_status,
+                await self.cctv_repository.update_streaming_status(
                     cam.id_cctv, 
                     True
                 )
@@ -448,17 +441,17 @@ class MediaMTXService:
     ) -> str:
         return f"rtsp://{username}:{password}@{ip_address}:554/cam/realmonitor?channel={channel}&subtype={subtype}"
 class StreamService:
-    def __init__(self, cctv_repository: CctvRepository, history_repository: HistoryRepository, location_repository: LocationRepository, notification_service: NotificationService):
+    def __init__(self, cctv_repository: AsyncCctvRepository, history_repository: AsyncHistoryRepository, location_repository: AsyncLocationRepository, notification_service: AsyncNotificationService):
         self.cctv_repository = cctv_repository
         self.location_repository = location_repository
         self.mediamtx_service = MediaMTXService(cctv_repository=cctv_repository, history_repository=history_repository, notification_service=notification_service)
 
     async def get_streams_by_location(self, location_id: int) -> Dict:
-        existing_location = self.location_repository.get_by_id(location_id)
+        existing_location = await self.location_repository.get_by_id(location_id)
         if not existing_location:
             raise HTTPException(status_code=400, detail="Lokasi tidak ditemukan")
         
-        cameras = self.cctv_repository.get_by_location(location_id).all()
+        cameras = await self.cctv_repository.get_by_location(location_id)
         
         mediamtx_online = await self.mediamtx_service.test_mediamtx_connection()
         
@@ -515,7 +508,7 @@ class StreamService:
         if len(cctv_ids) > 16:
             raise HTTPException(status_code=400, detail="Maksimum 16 ID CCTV yang diizinkan")
             
-        cameras = self.cctv_repository.get_by_ids(cctv_ids)
+        cameras = await self.cctv_repository.get_by_ids(cctv_ids)
         
         if not cameras:
             raise HTTPException(status_code=404, detail="Tidak ada CCTV yang ditemukan untuk ID yang diberikan.")
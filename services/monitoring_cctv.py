@@ -2,11 +2,10 @@ import asyncio
 import logging
 from typing import Callable, Optional
 
-from repositories.cctv_repository import CctvRepository
-from repositories.history_repository import HistoryRepository
-from repositories.user_repository import UserRepository
-from repositories.notification_repository import NotificationRepository
-from services.notification_service import NotificationService
+from repositories.cctv_repository import AsyncCctvRepository
+from repositories.history_repository import AsyncHistoryRepository
+from repositories.notification_repository import AsyncNotificationRepository
+from services.notification_service import AsyncNotificationService
 from services.mediamtx_service import MediaMTXService
 
 logger = logging.getLogger(__name__)
@@ -34,13 +33,12 @@ class BackgroundCCTVMonitor:
               
                 db = self.db_session_factory()
             
-                cctv_repo = CctvRepository(db)
-                history_repo = HistoryRepository(db)
-                user_repo = UserRepository(db)
-                notification_repo = NotificationRepository(db)
+                cctv_repo = AsyncCctvRepository(db)
+                history_repo = AsyncHistoryRepository(db)
+                notification_repo = AsyncNotificationRepository(db)
                 
-                notif_service = NotificationService(
-                    notification_repo, history_repo, cctv_repo, user_repo
+                notif_service = AsyncNotificationService(
+                    notification_repo, history_repo
                 )
                 stream_service = MediaMTXService(
                     cctv_repository=cctv_repo,
@@ -51,7 +49,7 @@ class BackgroundCCTVMonitor:
                 logger.info(" Mengecek service stream...")
                 await stream_service.get_all_streams_status()
 
-                db.commit()
+                await db.commit()
                 
             except asyncio.CancelledError:
                 logger.info("Monitor task dibatalkan")
@@ -60,12 +58,12 @@ class BackgroundCCTVMonitor:
             except Exception as e:
                 logger.error(f"Error in CCTV monitor: {e}", exc_info=True)
                 if db:
-                    db.rollback()
+                    await db.rollback()
                 await asyncio.sleep(50)
                 
             finally:
                 if db:
-                    db.close()
+                    await db.close()
 
             if self.is_running:
                 await asyncio.sleep(self.check_interval)
@@ -0,0 +1,72 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from repositories.notification_repository import NotificationRepository
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationRetentionService:
+    """Menghapus notifikasi lama secara bertahap.
+
+    Penghapusan dilakukan per batch kecil (keyset pada id_notification) dengan
+    jeda di antaranya, sehingga setiap transaksi singkat dan tidak menahan lock
+    pada index notifikasi yang dipakai endpoint.
+    """
+
+    def __init__(
+        self,
+        notification_repo: NotificationRepository,
+        retention_days: int,
+        max_per_user: int,
+        batch_size: int = 1000,
+        pause: float = 0.5
+    ):
+        self.notification_repo = notification_repo
+        self.retention_days = retention_days
+        self.max_per_user = max_per_user
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def prune(self) -> dict:
+        expired = self.prune_expired() if self.retention_days > 0 else 0
+        over_cap = self.prune_over_cap() if self.max_per_user > 0 else 0
+        return {"expired": expired, "over_cap": over_cap}
+
+    def prune_expired(self) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        total = self.prune_range(None, cutoff)
+        if total:
+            logger.info(f"{total} notifikasi lebih lama dari {self.retention_days} hari dihapus")
+        return total
+
+    def prune_range(self, start: Optional[datetime], end: datetime) -> int:
+        """Hapus notifikasi yang created_at history-nya di [start, end)."""
+        total = 0
+        last_id = 0
+        while True:
+            ids = self.notification_repo.get_expired_ids(end, last_id, self.batch_size, since=start)
+            if not ids:
+                break
+            total += self.notification_repo.delete_batch(ids)
+            last_id = ids[-1]
+            if len(ids) < self.batch_size:
+                break
+            time.sleep(self.pause)
+        return total
+
+    def prune_over_cap(self) -> int:
+        total = 0
+        for user_id in self.notification_repo.get_user_ids_over_cap(self.max_per_user):
+            while True:
+                ids = self.notification_repo.get_ids_over_cap(user_id, self.max_per_user, self.batch_size)
+                if not ids:
+                    break
+                total += self.notification_repo.delete_batch(ids)
+                time.sleep(self.pause)
+
+        if total:
+            logger.info(f"{total} notifikasi melebihi batas {self.max_per_user} per user dihapus")
+        return total
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[[Any], Any]
+    interval: int
+    initial_delay: int = 0
+
+
+class BackgroundScheduler:
+    """Menjalankan job pemeliharaan periodik selama lifespan aplikasi.
+
+    Setiap job menerima session database baru dan dijalankan di thread
+    terpisah agar query yang lama tidak menahan event loop.
+    """
+
+    def __init__(self, db_session_factory: Callable):
+        self.db_session_factory = db_session_factory
+        self.is_running = False
+        self._jobs: List[ScheduledJob] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[Any], Any], interval: int, initial_delay: int = 0):
+        self._jobs.append(ScheduledJob(name, func, interval, initial_delay))
+
+    async def start(self):
+        self.is_running = True
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._run_job(job)))
+        logger.info(f"Scheduler started dengan {len(self._jobs)} job")
+
+    async def _run_job(self, job: ScheduledJob):
+        if job.initial_delay:
+            await asyncio.sleep(job.initial_delay)
+
+        while self.is_running:
+            try:
+                result = await asyncio.to_thread(self._execute, job)
+                logger.info(f"Job {job.name} selesai: {result}")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error pada job {job.name}: {e}", exc_info=True)
+
+            if self.is_running:
+                await asyncio.sleep(job.interval)
+
+    def _execute(self, job: ScheduledJob):
+        db = self.db_session_factory()
+        try:
+            return job.func(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def stop(self):
+        logger.info("Stopping scheduler...")
+        self.is_running = False
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
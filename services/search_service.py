@@ -0,0 +1,53 @@
+from repositories.cctv_repository import CctvRepository
+from repositories.location_repository import LocationRepository
+from repositories.user_repository import UserRepository
+
+
+class SearchService:
+    def __init__(
+        self,
+        cctv_repository: CctvRepository,
+        location_repository: LocationRepository,
+        user_repository: UserRepository
+    ):
+        self.cctv_repository = cctv_repository
+        self.location_repository = location_repository
+        self.user_repository = user_repository
+
+    def search(self, q: str, limit: int = 20, include_users: bool = False) -> list[dict]:
+        q = q.strip()
+        results = [
+            {
+                "type": "cctv",
+                "id": row.id_cctv,
+                "label": row.titik_letak,
+                "detail": f"{row.ip_address} - {row.cctv_location_name}",
+                "score": round(row.score, 3),
+            }
+            for row in self.cctv_repository.search(q, limit)
+        ]
+        results.extend(
+            {
+                "type": "location",
+                "id": row.id_location,
+                "label": row.nama_lokasi,
+                "detail": None,
+                "score": round(row.score, 3),
+            }
+            for row in self.location_repository.search(q, limit)
+        )
+        if include_users:
+            results.extend(
+                {
+                    "type": "user",
+                    "id": row.id_user,
+                    "label": row.nama,
+                    "detail": row.username,
+                    "score": round(row.score, 3),
+                }
+                for row in self.user_repository.search(q, limit)
+            )
+
+        # setiap repository sudah mengurutkan dan membatasi hasilnya sendiri
+        results.sort(key=lambda item: item["score"], reverse=True)
+        return results[:limit]
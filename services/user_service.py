@@ -1,22 +1,47 @@
 from models.user_model import User
 from repositories.user_repository import UserRepository
 from repositories.role_repository import RoleRepository
-from schemas.user_schemas import UserCreate, UserUpdate
+from repositories.data_version_repository import DataVersionRepository
+from schemas.user_schemas import NIK_PATTERN, UserCreate, UserUpdate
 from fastapi import HTTPException, status
-from io import BytesIO
-from concurrent.futures import ThreadPoolExecutor
-from core.security import hash_password  
+from core.security import password_hasher
 from datetime import datetime
-from pydantic import ValidationError
-import pandas as pd
+from typing import Callable
+import logging
+from services.import_reader import iter_import_chunks
+from services.import_preview import add_to_diff, chunked, field_changes, new_diff
+from services.import_validation import (
+    collect_errors, duplicate_errors, field_errors_for, first_error, import_frame, string_errors
+)
+from services.export_writer import (
+    ExportColumn, STREAM_FORMATS, XLSX_MEDIA_TYPE,
+    export_filename, iter_file, iter_rows, parquet_export, stream_export, write_xlsx
+)
+
+logger = logging.getLogger(__name__)
+
+# kolom password boleh tidak ada, diisi password default
+USER_IMPORT_COLUMNS = ["nama", "username", "nik", "role"]
+USER_IMPORT_ROLES = {"superadmin": 1, "security": 2}
+DEFAULT_PASSWORD = "Rsch123"
+
+USER_EXPORT_COLUMNS = [
+    ExportColumn("nama", "Nama"),
+    ExportColumn("username", "Username"),
+    ExportColumn("nik", "Nik"),
+    ExportColumn("role", "Role"),
+]
 
 class UserService:
     def __init__(self, user_repository: UserRepository, role_repository: RoleRepository):
         self.user_repository = user_repository
         self.role_repository = role_repository
 
-    def get_all_users(self, skip: int = 0, limit: int = 100 ):
-        return self.user_repository.get_all(skip, limit)
+    def get_all_users(self, before_id: int = None, after_id: int = None, limit: int = 100, skip: int = 0):
+        return self.user_repository.get_all(before_id, after_id, limit, skip)
+
+    def estimate_total(self) -> int:
+        return self.user_repository.estimate_total()
 
     def create_user(self, user: UserCreate):
         existing_nik = self.user_repository.get_by_nik(user.nik)
@@ -87,88 +112,161 @@ class UserService:
             )
         return user
 
-    def export_users(self):
-        data = self.user_repository.get_all_for_export()
-        df = pd.DataFrame([dict(row._mapping) for row in data])
-        df.rename(columns={
-                "nama": "Nama",
-                "username": "Username",
-                "nik": "Nik",
-                "role": "Role"
-            }, inplace=True)
-            
-        unique_time = datetime.now().strftime("%Y%m%d%H%M%S") 
-        
-        output = BytesIO() 
-        
-        df.to_excel(output, index=False)
-        
-        output.seek(0)
+    def export_version(self) -> dict:
+        return DataVersionRepository(self.user_repository.db).get_versions(["users", "role"])
+
+    @staticmethod
+    def export_filename(export_format: str = "xlsx") -> str:
+        return export_filename(UserService._export_stem(), export_format)
+
+    @staticmethod
+    def _export_stem() -> str:
+        unique_time = datetime.now().strftime("%Y%m%d%H%M%S")
+        return f"Users_export_{unique_time}"
+
+    def export_users(self, export_format: str = "xlsx"):
+        filename = self._export_stem()
+        if export_format in STREAM_FORMATS:
+            rows = iter_rows(
+                self.user_repository.db.get_bind(),
+                lambda db: UserRepository(db).iter_for_export()
+            )
+            return stream_export(export_format, rows, USER_EXPORT_COLUMNS, filename)
+        if export_format == "parquet":
+            return parquet_export(self.user_repository.iter_for_export(), USER_EXPORT_COLUMNS, filename)
+
+        output = write_xlsx(self.user_repository.iter_for_export(), USER_EXPORT_COLUMNS)
 
         return {
-            "data": output, 
-            "filename": f"Users_export_{unique_time}.xlsx",
-            "media_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            "data": iter_file(output), 
+            "filename": export_filename(filename, export_format),
+            "media_type": XLSX_MEDIA_TYPE
         }
 
     @staticmethod
-    def parse_import_user(uploaded_file):
-        contents = uploaded_file.file.read()
-        df = pd.read_excel(BytesIO(contents), dtype={"Nik": str})
-        df.columns = df.columns.str.strip().str.lower()
-
-        df = df.rename(columns={
-            "nama": "nama",
-            "username": "username",
-            "nik": "nik",
-            "password": "password",
-            "role": "role"
-        })
-    
-        rows = df.to_dict("records")
-    
-        validated_rows = []
-        errors = []
-    
-        for idx, row in enumerate(rows, start=2):  
-            try:
-                role_str = str(row.get("role", "")).strip().lower()
-                if not role_str:
-                    raise ValueError("Role kosong")
-    
-                if role_str == "superadmin":
-                    id_role = 1
-                elif role_str == "security":
-                    id_role = 2
-                else:
-                    raise ValueError(f"Role invalid: {role_str}")
- 
-                user = UserCreate(
-                    nama=row.get("nama"),
-                    username=row.get("username"),
-                    nik=row.get("nik"),
-                    password=row.get("password") or "Rsch123",  
-                    id_role=id_role
+    def validate_import_chunk(chunk: list[dict], seen: dict) -> tuple[list[dict], list[str]]:
+        """Validasi satu chunk baris import user per kolom.
+
+        Aturan sama dengan UserCreate; model Pydantic hanya dibuat untuk baris
+        yang valid. seen menyimpan username dan nik dari chunk sebelumnya
+        (nilai -> nomor baris) untuk cek duplikasi di dalam file.
+        """
+        frame = import_frame(chunk, [*USER_IMPORT_COLUMNS, "password"])
+        frame["password"] = frame["password"].where(frame["password"].notna(), DEFAULT_PASSWORD)
+
+        role = frame["role"].astype("string").str.lower()
+        frame["id_role"] = role.map(USER_IMPORT_ROLES)
+        role_errors = (
+            ("Role invalid: " + role).astype(object)
+            .where(frame["id_role"].isna(), None)
+            .mask(role.isna(), "Role kosong")
+        )
+
+        field_errors = first_error(
+            role_errors,
+            field_errors_for("nama", string_errors(frame["nama"], 5, 50)),
+            field_errors_for("nik", string_errors(frame["nik"], 9, 11, pattern=NIK_PATTERN)),
+            field_errors_for("username", string_errors(frame["username"], 5, 50)),
+            field_errors_for("password", string_errors(frame["password"], 6, 255)),
+        )
+        valid = field_errors.isna()
+        duplicate_username = duplicate_errors(frame, valid, "username", "Username", seen["username"])
+        duplicate_nik = duplicate_errors(frame, valid, "nik", "Nik", seen["nik"])
+
+        errors = collect_errors(frame, field_errors, duplicate_username, duplicate_nik)
+        valid &= duplicate_username.isna() & duplicate_nik.isna()
+        records = frame.loc[valid, ["nama", "username", "nik", "password", "id_role"]].astype({"id_role": int})
+        validated_rows = [
+            UserCreate.model_construct(**record).model_dump()
+            for record in records.to_dict("records")
+        ]
+        return validated_rows, errors
+
+    def _validated_chunks(self, uploaded_file):
+        seen = {"username": {}, "nik": {}}
+        for chunk in iter_import_chunks(uploaded_file, USER_IMPORT_COLUMNS):
+            rows, errors = self.validate_import_chunk(chunk, seen)
+            if errors:
+                raise HTTPException(
+                    status_code=400,
+                    detail={"message": "Data tidak valid", "errors": errors}
                 )
-    
-                validated_rows.append(user.model_dump())
-    
-            except Exception as e:
-                errors.append(f"Baris {idx}: {e}")
-    
-        if errors:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "message": "Data tidak valid",
-                    "errors": errors
-                }
+            yield rows
+
+    def import_user_file(self, uploaded_file, on_progress: Callable[[dict], None] = None) -> dict:
+        """Import user dari xlsx/csv per chunk dalam satu transaksi."""
+        return self._run_import(self._validated_chunks(uploaded_file), on_progress)
+
+    def apply_import(self, rows: list[dict]) -> dict:
+        """Import baris hasil dry-run yang sudah divalidasi."""
+        return self._run_import(chunked(rows))
+
+    def preview_user_file(self, uploaded_file) -> tuple[list[dict], dict]:
+        """Dry-run import user: validasi seluruh file dan hitung diff tanpa menulis.
+
+        Password tidak ikut dibandingkan; user yang cocok tetap di-reset
+        passwordnya saat apply.
+        """
+        seen = {"username": {}, "nik": {}}
+        rows = []
+        diff = new_diff()
+        for chunk in iter_import_chunks(uploaded_file, USER_IMPORT_COLUMNS):
+            valid_rows, errors = self.validate_import_chunk(chunk, seen)
+            diff["errors"].extend(errors)
+            rows.extend(valid_rows)
+
+        for chunk in chunked(rows):
+            existing_users = self.user_repository.get_existing_users_by_username_or_nik(
+                [row["username"] for row in chunk],
+                [row["nik"] for row in chunk]
             )
-    
-        return validated_rows
+            by_username = {user.username: user for user in existing_users}
+            by_nik = {user.nik: user for user in existing_users}
+
+            for row in chunk:
+                new = {field: row[field] for field in ("nama", "username", "nik", "id_role")}
+                existing = by_username.get(row["username"]) or by_nik.get(row["nik"])
+                if not existing:
+                    add_to_diff(diff, "creates", new)
+                    continue
+                current = {field: getattr(existing, field) for field in new}
+                changes = field_changes(current, new)
+                if changes:
+                    add_to_diff(diff, "updates", {"id_user": existing.id_user, **current, "perubahan": changes})
+                else:
+                    diff["unchanged"] += 1
+
+        return rows, diff
+
+    def _run_import(self, chunks, on_progress: Callable[[dict], None] = None) -> dict:
+        summary = {"total_processed": 0, "total_imported": 0, "total_updated": 0, "chunks": []}
+        db = self.user_repository.db
+
+        try:
+            for number, rows in enumerate(chunks, start=1):
+                result = self.import_users(rows, commit=False)
+                progress = {
+                    "chunk": number,
+                    "rows": len(rows),
+                    "imported": len(result["imported"]),
+                    "updated": len(result["updated"]),
+                }
+                summary["total_processed"] += progress["rows"]
+                summary["total_imported"] += progress["imported"]
+                summary["total_updated"] += progress["updated"]
+                summary["chunks"].append(progress)
+                logger.info(f"Import user chunk {number}: {progress}")
+                if on_progress:
+                    on_progress({**progress, "total_processed": summary["total_processed"]})
 
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
 
-    def import_users(self, rows: list[dict]):
+        return summary
+
+    def import_users(self, rows: list[dict], commit: bool = True):
         username_cek = {}
         nik_cek = {}
 
@@ -194,7 +292,6 @@ class UserService:
                     "errors": internal_errors
                 }
             )
-        DEFAULT_PASSWORD = "Rsch123"
         usernames = [row["username"] for row in rows]
         niks = [str(row["nik"]) for row in rows]
 
@@ -204,7 +301,6 @@ class UserService:
    
         users_to_create = []
         users_to_update = []
-        passwords_to_hash = []
    
         for row in rows:
            nik_str = str(row["nik"])
@@ -228,7 +324,6 @@ class UserService:
                        "password": final_password
                    }
                })
-               passwords_to_hash.append(final_password)
 
            elif user_by_username:
                users_to_update.append({
@@ -240,7 +335,6 @@ class UserService:
                        "password": final_password
                    }
                })
-               passwords_to_hash.append(final_password)
 
            elif user_by_nik:
                users_to_update.append({
@@ -252,7 +346,6 @@ class UserService:
                        "password": final_password
                    }
                })
-               passwords_to_hash.append(final_password)
 
            else:
                users_to_create.append({
@@ -262,23 +355,16 @@ class UserService:
                    "id_role": id_role,
                    "password": final_password
                })
-               passwords_to_hash.append(final_password)
 
-        if not passwords_to_hash:
+        password_targets = [update_item["data"] for update_item in users_to_update] + users_to_create
+        if not password_targets:
            return {"imported": [], "updated": []}
   
-        with ThreadPoolExecutor(max_workers=4) as executor:
-           hashed_passwords = list(executor.map(hash_password, passwords_to_hash))
-   
-        hash_idx = 0
-   
-        for update_item in users_to_update:
-           update_item["data"]["password"] = hashed_passwords[hash_idx]
-           hash_idx += 1
+        # tiap baris di-hash sendiri agar salt tidak sama walau password default sama
+        hashed_passwords = password_hasher.hash_many([target["password"] for target in password_targets])
    
-        for user_data in users_to_create:
-           user_data["password"] = hashed_passwords[hash_idx]
-           hash_idx += 1
+        for target, hashed_password in zip(password_targets, hashed_passwords):
+           target["password"] = hashed_password
    
         updated_users = []
         for update_item in users_to_update:
@@ -290,7 +376,10 @@ class UserService:
         db_users = [User(**user_data) for user_data in users_to_create]
         self.user_repository.db.add_all(db_users)
    
-        self.user_repository.db.commit()
+        if commit:
+            self.user_repository.db.commit()
+        else:
+            self.user_repository.db.flush()
    
         return {
            "imported": db_users,
@@ -0,0 +1,21 @@
+import os
+import sys
+
+# settings wajib agar modul aplikasi bisa di-import; engine database
+# dibuat saat import tapi koneksi baru dibuka ketika dipakai
+TEST_SETTINGS = {
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_NAME": "cctv_test",
+    "DB_HOST": "127.0.0.1",
+    "DB_PORT": "5432",
+    "MEDIAMTX_API": "http://127.0.0.1:9997",
+    "MEDIAMTX_STREAM": "http://127.0.0.1:8888",
+    "SECRET_KEY": "test-secret-key-yang-panjangnya-minimal-32",
+    "HOST_IP_FOR_CLIENT": "127.0.0.1",
+    "IP_PC": "http://127.0.0.1:3000",
+}
+for key, value in TEST_SETTINGS.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from services.cctv_service import CctvService
+
+
+def new_seen():
+    return {"ip_address": {}, "titik_letak": {}}
+
+
+def test_validate_rejects_location_longer_than_column():
+    chunk = [
+        {"_row": 2, "titik letak": "Lobby", "ip address": "10.0.0.1", "server monitoring": "x" * 50},
+        {"_row": 3, "titik letak": "Parkir", "ip address": "10.0.0.2", "server monitoring": "x" * 51},
+    ]
+
+    rows, errors = CctvService.validate_import_chunk(chunk, new_seen())
+
+    assert [row["_row"] for row in rows] == [2]
+    assert errors == ["Baris 3: String should have at most 50 characters"]
+
+
+class ConflictRepository:
+    db = SimpleNamespace(commit=lambda: None)
+
+    def upsert_import(self, rows):
+        return {"imported": 0, "updated": 0, "conflicts": [(5, 2)]}
+
+
+def test_import_reports_rows_matching_same_cctv():
+    service = CctvService(ConflictRepository(), None)
+    rows = [
+        {"_row": 2, "titik_letak": "Lobby", "ip_address": "10.0.0.1", "nama_lokasi": "Gedung A"},
+        {"_row": 5, "titik_letak": "Parkir", "ip_address": "10.0.0.2", "nama_lokasi": "Gedung A"},
+    ]
+
+    with pytest.raises(HTTPException) as exc:
+        service.import_cctvs(rows)
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail["errors"] == [
+        "Baris 5: cocok dengan cctv yang sama dengan baris 2 (lewat IP atau titik letak)"
+    ]
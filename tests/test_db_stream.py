@@ -0,0 +1,61 @@
+import asyncio
+import sys
+import zlib
+
+import pytest
+
+import database
+from database import DatabaseService
+
+
+def fake_pg_dump(monkeypatch, script):
+    monkeypatch.setattr(
+        DatabaseService, "_dump_command",
+        lambda self, table_name, data_only, dump_format: ([sys.executable, "-c", script], None)
+    )
+
+
+async def collect(dump):
+    return [chunk async for chunk in dump["data"]]
+
+
+def test_stream_compresses_full_dump(monkeypatch):
+    fake_pg_dump(monkeypatch, "import sys; sys.stdout.write('SELECT 1;' * 20000)")
+
+    async def run():
+        dump = await DatabaseService().stream_sql(dump_format="plain", compression="gzip")
+        return b"".join(await collect(dump))
+
+    assert zlib.decompress(asyncio.run(run()), 31) == b"SELECT 1;" * 20000
+    assert not database._dump_lock.locked()
+
+
+def test_stream_aborts_without_trailer_when_pg_dump_fails(monkeypatch):
+    fake_pg_dump(monkeypatch, "import sys; sys.stdout.write('SELECT 1;'); sys.stdout.flush(); sys.exit(1)")
+    chunks = []
+
+    async def run():
+        dump = await DatabaseService().stream_sql(dump_format="plain", compression="gzip")
+        async for chunk in dump["data"]:
+            chunks.append(chunk)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    # trailer gzip tidak pernah dikirim, client melihat file terpotong
+    decompressor = zlib.decompressobj(31)
+    decompressor.decompress(b"".join(chunks))
+    assert not decompressor.eof
+    assert not database._dump_lock.locked()
+
+
+def test_close_releases_lock_when_body_never_starts(monkeypatch):
+    fake_pg_dump(monkeypatch, "import sys, time; sys.stdout.write('x'); sys.stdout.flush(); time.sleep(30)")
+
+    async def run():
+        dump = await DatabaseService().stream_sql(dump_format="plain")
+        assert database._dump_lock.locked()
+        await dump["close"]()
+        await dump["close"]()
+
+    asyncio.run(run())
+    assert not database._dump_lock.locked()
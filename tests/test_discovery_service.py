@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from services.discovery_service import DiscoveryService
+
+PROBE_MATCH = b"""<?xml version="1.0" encoding="UTF-8"?>
+<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope"
+            xmlns:w="http://schemas.xmlsoap.org/ws/2004/08/addressing"
+            xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery">
+  <e:Body>
+    <d:ProbeMatches>
+      <d:ProbeMatch>
+        <w:EndpointReference><w:Address>urn:uuid:cam-lobby</w:Address></w:EndpointReference>
+        <d:Scopes>onvif://www.onvif.org/type/video_encoder onvif://www.onvif.org/name/Lobby%20Utama</d:Scopes>
+        <d:XAddrs>http://127.0.0.1:8080/onvif/device_service</d:XAddrs>
+      </d:ProbeMatch>
+    </d:ProbeMatches>
+  </e:Body>
+</e:Envelope>"""
+
+
+class FakeCctvRepository:
+    def __init__(self, cameras):
+        self.cameras = cameras
+
+    def get_existing_in_subnets(self, subnets, position_list):
+        return {
+            "ip": {cam.ip_address: cam for cam in self.cameras},
+            "position": {cam.titik_letak: cam for cam in self.cameras if cam.titik_letak in position_list},
+        }
+
+
+async def _start_listener(host: str):
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), host, 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_parse_probe_match():
+    device = DiscoveryService._parse_probe_match(PROBE_MATCH, "127.0.0.9")
+
+    assert device["ip"] == "127.0.0.1"
+    assert device["name"] == "Lobby Utama"
+    assert device["endpoint"] == "urn:uuid:cam-lobby"
+    assert DiscoveryService._parse_probe_match(b"bukan xml", "127.0.0.9") is None
+
+
+def test_scan_reports_only_open_ports():
+    async def run():
+        server, port = await _start_listener("127.0.0.1")
+        closed_server, closed_port = await _start_listener("127.0.0.1")
+        closed_server.close()
+        await closed_server.wait_closed()
+        try:
+            service = DiscoveryService(FakeCctvRepository([]), concurrency=4)
+            assert await service.probe_port("127.0.0.1", port, 1.0)
+            assert not await service.probe_port("127.0.0.1", closed_port, 1.0)
+            return await service.scan(["127.0.0.1", "127.0.0.2"], [port, closed_port], 1.0)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    open_ports = asyncio.run(run())
+    # listener hanya di 127.0.0.1, host lain tidak merespons
+    assert list(open_ports) == ["127.0.0.1"]
+    assert len(open_ports["127.0.0.1"]) == 1
+
+
+def test_discover_classifies_new_missing_and_moved():
+    cameras = [
+        # masih terdaftar di 127.0.0.2 tapi tidak merespons -> hilang
+        SimpleNamespace(id_cctv=1, titik_letak="Gudang", ip_address="127.0.0.2"),
+        # ONVIF "Lobby Utama" kini menjawab dari 127.0.0.1 -> pindah
+        SimpleNamespace(id_cctv=2, titik_letak="Lobby Utama", ip_address="127.0.0.3"),
+    ]
+
+    async def run():
+        moved_server, moved_port = await _start_listener("127.0.0.1")
+        new_server, new_port = await _start_listener("127.0.0.4")
+        try:
+            service = DiscoveryService(FakeCctvRepository(cameras), concurrency=8)
+            device = service._parse_probe_match(PROBE_MATCH, "127.0.0.1")
+            service.ws_discovery = AsyncMock(return_value={device["ip"]: device})
+            return new_port, await service.discover(
+                ["127.0.0.0/29"], [moved_port, new_port], onvif=True, timeout=1.0
+            )
+        finally:
+            for server in (moved_server, new_server):
+                server.close()
+                await server.wait_closed()
+
+    new_port, result = asyncio.run(run())
+
+    assert result["scanned_hosts"] == 6
+    assert result["moved"] == [{
+        "id_cctv": 2,
+        "titik_letak": "Lobby Utama",
+        "old_ip": "127.0.0.3",
+        "new_ip": "127.0.0.1",
+    }]
+    assert result["new"] == [{"ip_address": "127.0.0.4", "open_ports": [new_port], "onvif_name": None}]
+    assert result["missing"] == [{"id_cctv": 1, "titik_letak": "Gudang", "ip_address": "127.0.0.2"}]
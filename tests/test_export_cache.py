@@ -0,0 +1,28 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from core import export_cache
+from core.export_cache import ExportCache, cached_export_response
+
+
+def test_cache_hit_uses_filename_of_current_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_cache, "export_cache", ExportCache(str(tmp_path), 10 * 1024 * 1024))
+    builds = []
+    app = FastAPI()
+
+    @app.get("/export")
+    def export(request: Request, stamp: str):
+        def build():
+            builds.append(stamp)
+            return {"data": iter([b"isi export"]), "filename": "lama.csv.gz", "media_type": "application/gzip"}
+
+        return cached_export_response(request, "cctv", {"format": "csv"}, {"cctv_camera": 1}, f"Cctvs_export_{stamp}.csv.gz", build)
+
+    client = TestClient(app)
+    first = client.get("/export", params={"stamp": "20260101000000"})
+    second = client.get("/export", params={"stamp": "20260102000000"})
+
+    assert builds == ["20260101000000"]
+    assert first.content == second.content == b"isi export"
+    assert first.headers["content-disposition"] == "attachment; filename=Cctvs_export_20260101000000.csv.gz"
+    assert 'filename="Cctvs_export_20260102000000.csv.gz"' in second.headers["content-disposition"]
@@ -0,0 +1,44 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from core.config import settings
+from services.history_partition_service import HistoryPartitionService
+
+
+class FakeHistoryRepository:
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.calls = []
+
+    def list_partitions(self):
+        return list(self.partitions)
+
+    def copy_partition(self, name, fileobj):
+        fileobj.write(b"id_history\n")
+
+    def drop_partition(self, name):
+        self.calls.append(("drop", name))
+
+
+class FakeRetention:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def prune_range(self, start, end):
+        self.repository.calls.append(("prune", start, end))
+        return 0
+
+
+def test_archive_prunes_notifications_by_month_before_drop(tmp_path):
+    repository = FakeHistoryRepository(["history_2000_01", "history_2999_01", "history_plan_check"])
+    service = HistoryPartitionService(
+        repository, FakeRetention(repository), retention_months=1, archive_dir=str(tmp_path)
+    )
+
+    assert service.archive_expired() == ["history_2000_01"]
+    zone = ZoneInfo(settings.TIMEZONE)
+    assert repository.calls == [
+        ("prune", datetime(2000, 1, 1, tzinfo=zone), datetime(2000, 2, 1, tzinfo=zone)),
+        ("drop", "history_2000_01"),
+    ]
+    assert (tmp_path / "history_2000_01.csv.gz").exists()
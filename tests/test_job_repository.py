@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.job_model import Job, JobStatus
+from repositories.job_repository import JobRepository
+
+
+@pytest.fixture
+def repository():
+    engine = create_engine("sqlite://")
+    Job.__table__.create(engine)
+    with sessionmaker(bind=engine)() as db:
+        yield JobRepository(db)
+
+
+def make_job(repository, id_job, owner, heartbeat_at):
+    expires_at = datetime.now(ZoneInfo("UTC")) + timedelta(days=1)
+    repository.create(id_job, "export", {}, None, expires_at, owner)
+    repository.db.query(Job).filter(Job.id_job == id_job).update({"heartbeat_at": heartbeat_at})
+    repository.db.commit()
+
+
+def test_fail_stale_skips_live_and_own_jobs(repository):
+    now = datetime.now(ZoneInfo("UTC"))
+    make_job(repository, "live", "worker-b", now)
+    make_job(repository, "dead", "worker-c", now - timedelta(minutes=10))
+    make_job(repository, "own", "worker-a", now - timedelta(minutes=10))
+
+    count = repository.fail_stale("worker-a", now - timedelta(minutes=2), "terhenti")
+
+    assert count == 1
+    statuses = {job.id_job: job.status for job in repository.db.query(Job)}
+    assert statuses == {"live": JobStatus.queued, "dead": JobStatus.failed, "own": JobStatus.queued}
+
+
+def test_update_ignores_jobs_not_owned_or_finished(repository):
+    make_job(repository, "job", "worker-a", datetime.now(ZoneInfo("UTC")))
+
+    assert not repository.update("job", "worker-b", status=JobStatus.running)
+    assert repository.update("job", "worker-a", status=JobStatus.failed)
+    assert not repository.update("job", "worker-a", status=JobStatus.succeeded)
+    assert repository.get_by_id("job").status == JobStatus.failed
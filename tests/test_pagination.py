@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from repositories.pagination import page_meta
+
+
+def rows(*ids):
+    return [SimpleNamespace(id_cctv=id_cctv) for id_cctv in ids]
+
+
+def test_first_page_has_no_backward_cursor():
+    meta = page_meta(rows(10, 9, 8), "id_cctv", 3)
+
+    assert meta == {"limit": 3, "next_before_id": 8, "prev_after_id": None}
+
+
+def test_backward_partial_page_keeps_forward_cursor():
+    # after_id=5 dengan limit 3 hanya mendapat 2 baris: tidak ada data lebih baru,
+    # tapi data sampai id 5 masih ada
+    meta = page_meta(rows(7, 6), "id_cctv", 3, after_id=5)
+
+    assert meta == {"limit": 3, "next_before_id": 6, "prev_after_id": None}
+
+
+def test_backward_full_page_has_both_cursors():
+    meta = page_meta(rows(8, 7, 6), "id_cctv", 3, after_id=5)
+
+    assert meta == {"limit": 3, "next_before_id": 6, "prev_after_id": 8}
+
+
+def test_empty_backward_page_points_back_at_cursor():
+    meta = page_meta([], "id_cctv", 3, after_id=5)
+
+    assert meta == {"limit": 3, "next_before_id": 6, "prev_after_id": None}
+
+
+def test_forward_partial_page_ends_list():
+    meta = page_meta(rows(4, 3), "id_cctv", 3, before_id=5)
+
+    assert meta == {"limit": 3, "next_before_id": None, "prev_after_id": 4}
+
+
+def test_ascending_backward_partial_page():
+    meta = page_meta(rows(3, 4), "id_cctv", 3, before_id=5, descending=False)
+
+    assert meta == {"limit": 3, "next_after_id": 4, "prev_before_id": None}
@@ -0,0 +1,12 @@
+from core.security import PasswordHasher, verify_password
+
+
+def test_hash_many_salts_every_row():
+    hasher = PasswordHasher(max_workers=1, max_pending=4, queue_timeout=1)
+
+    hashes = hasher.hash_many(["default123", "default123", "lain456"])
+
+    assert len(hashes) == 3
+    assert hashes[0] != hashes[1]
+    assert verify_password("default123", hashes[1])
+    assert verify_password("lain456", hashes[2])
@@ -0,0 +1,54 @@
+import pytest
+
+import database
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    # engine replica tidak pernah dipakai untuk koneksi di sini, cukup ada
+    monkeypatch.setattr(database, "replica_engine", object())
+    monkeypatch.setattr(database, "_recent_writers", {})
+    monkeypatch.setattr(database.settings, "DB_REPLICA_STICKY_SECONDS", 5)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"value": 1000.0}
+    monkeypatch.setattr(database.time, "monotonic", lambda: now["value"])
+    return now
+
+
+def test_without_replica_always_reads_primary(monkeypatch):
+    monkeypatch.setattr(database, "replica_engine", None)
+    monkeypatch.setattr(database, "_recent_writers", {})
+
+    database.mark_recent_write("Bearer token-a")
+
+    assert database.use_primary_for_read("Bearer token-a")
+    assert database.use_primary_for_read(None)
+    assert database._recent_writers == {}
+
+
+def test_write_pins_reads_to_primary_until_sticky_window_ends(replica, clock):
+    assert not database.use_primary_for_read("Bearer token-a")
+
+    database.mark_recent_write("Bearer token-a")
+    assert database.use_primary_for_read("Bearer token-a")
+
+    clock["value"] += 4.9
+    assert database.use_primary_for_read("Bearer token-a")
+
+    clock["value"] += 0.2
+    assert not database.use_primary_for_read("Bearer token-a")
+
+
+def test_sticky_window_is_keyed_by_authorization_hash(replica, clock):
+    database.mark_recent_write("Bearer token-a")
+
+    assert database.use_primary_for_read("Bearer token-a")
+    assert not database.use_primary_for_read("Bearer token-b")
+    # anonim tidak pernah ditandai
+    assert not database.use_primary_for_read(None)
+    # token mentah tidak disimpan, hanya hash-nya
+    assert "Bearer token-a" not in database._recent_writers
+    assert database._writer_key("Bearer token-a") in database._recent_writers
@@ -0,0 +1,57 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from core.upload_limit import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
+
+MAX_BYTES = 1024 * 1024
+received = []
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_BYTES)
+
+    @app.post("/import")
+    async def import_file(file: UploadFile = File(...)):
+        received.append(file.filename)
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def test_accepts_upload_within_limit():
+    response = make_client().post("/import", files={"file": ("data.csv", b"x" * MAX_BYTES)})
+
+    assert response.status_code == 200
+    assert response.json() == {"size": MAX_BYTES}
+
+
+def test_rejects_on_content_length_before_reading_body():
+    received.clear()
+    body = b"x" * (MAX_BYTES + MULTIPART_OVERHEAD + 1)
+
+    response = make_client().post("/import", files={"file": ("data.csv", body)})
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Ukuran file maksimal 1 MB"}
+    assert received == []
+
+
+def test_rejects_chunked_upload_while_streaming():
+    received.clear()
+    boundary = "batas"
+
+    def body():
+        yield f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="data.csv"\r\n\r\n'.encode()
+        for _ in range(40):
+            yield b"x" * 64 * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = make_client().post(
+        "/import",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
+    assert received == []